@@ -0,0 +1,184 @@
+# Benchmarks for the GEDCOM parser
+#
+# Usage: python benchmark.py [number of individuals]
+#
+# A synthetic GEDCOM file is generated in a temporary directory, so the
+# results do not depend on any private family tree files.
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from gedcom.element.individual import IndividualElement
+from gedcom.parser import Parser, BACKEND_ARRAYS, TOKENIZER_FAST, TOKENIZER_REGEX
+
+############### SUB-ROUTINES ######################
+
+# This routine writes a synthetic GEDCOM file with the given number of individuals
+def write_sample_gedcom(file_path, individuals):
+    lines = ['0 HEAD', '1 SOUR benchmark', '1 GEDC', '2 VERS 5.5.1', '1 CHAR UTF-8']
+    for i in range(individuals):
+        lines += [
+            '0 @I%d@ INDI' % i,
+            '1 NAME Given%d /Surname%d/' % (i, i % 500),
+            '2 GIVN Given%d' % i,
+            '2 SURN Surname%d' % (i % 500),
+            '1 SEX %s' % ('M' if i % 2 else 'F'),
+            '1 BIRT',
+            '2 DATE %d JAN %d' % (i % 28 + 1, 1700 + i % 300),
+            '2 PLAC Town %d, County, Country' % (i % 1000),
+            '2 SOUR @S1@',
+            '3 PAGE Page %d' % i,
+            '1 DEAT',
+            '2 DATE ABT %d' % (1760 + i % 300),
+            '1 FAMC @F%d@' % (i // 3),
+            '1 FAMS @F%d@' % (i // 3 + individuals),
+            '1 NOTE A fairly long note about this person that was written by a researcher',
+            '2 CONT and continued on a second line.',
+        ]
+    for i in range(individuals // 3 + 1):
+        lines += [
+            '0 @F%d@ FAM' % i,
+            '1 HUSB @I%d@' % (3 * i + 1),
+            '1 WIFE @I%d@' % (3 * i + 2),
+            '1 CHIL @I%d@' % (3 * i),
+            '2 _FREL Natural',
+            '2 _MREL Natural',
+            '1 MARR',
+            '2 DATE 1 JUN %d' % (1720 + i % 300),
+        ]
+    lines += ['0 @S1@ SOUR', '1 TITL Benchmark source', '0 TRLR']
+    with open(file_path, 'w') as gedcom_file:
+        gedcom_file.write('\r\n'.join(lines) + '\r\n')
+    return len(lines)
+
+# This routine writes individuals with many facts and sources, as exported by Ancestry
+def write_bloated_gedcom(file_path, individuals, facts=60):
+    lines = ['0 HEAD', '1 SOUR benchmark', '1 CHAR UTF-8']
+    for i in range(individuals):
+        lines += [
+            '0 @I%d@ INDI' % i,
+            '1 NAME Given%d /Surname%d/' % (i, i % 500),
+            '1 SEX %s' % ('M' if i % 2 else 'F'),
+        ]
+        for j in range(facts):
+            lines += [
+                '1 RESI',
+                '2 DATE %d' % (1850 + j),
+                '2 PLAC Town %d, County, Country' % j,
+                '2 SOUR @S1@',
+                '3 _APID 1,%d::%d' % (j, i),
+                '1 OBJE @O%d@' % j,
+                '1 SOUR @S1@',
+                '2 PAGE Page %d' % j,
+            ]
+        lines += [
+            '1 BIRT',
+            '2 DATE %d JAN %d' % (i % 28 + 1, 1800 + i % 100),
+            '2 PLAC Town %d, County, Country' % i,
+            '1 DEAT',
+            '2 DATE %d' % (1880 + i % 100),
+            '1 FAMC @F%d@' % i,
+        ]
+    lines += ['0 @S1@ SOUR', '1 TITL Benchmark source', '0 TRLR']
+    with open(file_path, 'w') as gedcom_file:
+        gedcom_file.write('\n'.join(lines) + '\n')
+
+# This routine returns the best wall clock time of a number of runs
+def best_time(function, runs=5):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+# This routine compares the line throughput of the tokenizers
+def benchmark_tokenizers(file_path, line_count):
+    print('Tokenizers (lines/second):')
+    for tokenizer in (TOKENIZER_REGEX, TOKENIZER_FAST):
+        elapsed = best_time(lambda: Parser().parse_file(file_path, tokenizer=tokenizer))
+        print('  %-10s %12.0f' % (tokenizer, line_count / elapsed))
+
+# This routine compares reading lines from the file with memory-mapped parsing
+def benchmark_mmap(file_path, line_count):
+    print('Memory-mapped parsing (lines/second):')
+    for use_mmap in (False, True):
+        elapsed = best_time(lambda: Parser().parse_file(file_path, use_mmap=use_mmap))
+        print('  %-10s %12.0f' % ('mmap' if use_mmap else 'file', line_count / elapsed))
+
+# This routine compares parsing in one process with parsing in a process pool
+def benchmark_workers(file_path, line_count):
+    print('Parallel parsing (lines/second):')
+    for workers in sorted(set([1, os.cpu_count() or 1])):
+        elapsed = best_time(lambda: Parser().parse_file(file_path, workers=workers))
+        print('  %-10s %12.0f' % ('%d workers' % workers, line_count / elapsed))
+
+# This routine measures how much memory a parsed tree takes per element
+def benchmark_memory(file_path):
+    print('Memory (bytes/element):')
+    for name, options in (('file', {}), ('mmap', {'use_mmap': True}), ('arrays', {'backend': BACKEND_ARRAYS})):
+        tracemalloc.start()
+        parser = Parser()
+        parser.parse_file(file_path, **options)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        elements = len(parser.get_element_list())
+        print('  %-10s %12.1f' % (name, float(size) / elements))
+
+# This routine times the individual getters used by compare.py on individuals with many facts
+def benchmark_getters(file_path):
+    print('Getters on individuals with many facts (calls/second):')
+    parser = Parser()
+    parser.parse_file(file_path)
+    individuals = [element for element in parser.get_element_list() if isinstance(element, IndividualElement)]
+
+    def call_getters():
+        for individual in individuals:
+            individual.get_name()
+            individual.get_gender()
+            individual.get_birth_data()
+            individual.get_birth_year()
+            individual.get_death_data()
+            individual.get_death_year()
+            individual.is_deceased()
+            individual.is_child()
+
+    # The first call builds the tag indexes, later calls use them
+    for name in ('first', 'repeated'):
+        elapsed = best_time(call_getters, 1)
+        print('  %-10s %12.0f' % (name, 8 * len(individuals) / elapsed))
+
+# This routine compares searching for individuals by scanning with searching the individual index
+def benchmark_search(file_path):
+    print('Individual search (searches/second):')
+    criteria = 'surname=^Surname1$:birth_range=1750-1800'
+    for indexed in (False, True):
+        parser = Parser()
+        parser.parse_file(file_path)
+        parser.enable_individual_index(indexed)
+        parser.find_individuals(criteria)
+        elapsed = best_time(lambda: parser.find_individuals(criteria))
+        print('  %-10s %12.0f' % ('index' if indexed else 'scan', 1 / elapsed))
+
+###############   MAIN PROGRAM    ##################
+
+if __name__ == '__main__':
+    individuals = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    directory = tempfile.mkdtemp()
+    file_path = os.path.join(directory, 'benchmark.ged')
+    line_count = write_sample_gedcom(file_path, individuals)
+    print('%d individuals, %d lines\n' % (individuals, line_count))
+
+    benchmark_tokenizers(file_path, line_count)
+    benchmark_mmap(file_path, line_count)
+    benchmark_workers(file_path, line_count)
+    benchmark_memory(file_path)
+    benchmark_search(file_path)
+
+    bloated_file_path = os.path.join(directory, 'bloated.ged')
+    write_bloated_gedcom(bloated_file_path, max(individuals // 20, 1))
+    benchmark_getters(bloated_file_path)
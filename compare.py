@@ -1,29 +1,18 @@
 # Import the things we need
 from gedcom.element.individual import IndividualElement
 from gedcom.parser import Parser
+from gedcom.blocking import get_blocking_key
+from gedcom.cache import SnapshotCache
+from gedcom.criteria import Criteria
+from gedcom.date import parse_date
+from gedcom.matching import ComparisonFrontier, PairScorer, match_individuals, score_individuals
 import datetime
 
 ############### SUB-ROUTINES ######################
 
 # This routine tries to ensure the date is in a simple, common format
 def GetStandardisedDate(txt):
-	txt=txt.upper()
-	txt=txt.replace('JANUARY','JAN')
-	txt=txt.replace('FEBRUARY','FEB')
-	txt=txt.replace('MARCH','MAR')
-	txt=txt.replace('APRIL','APR')
-	txt=txt.replace('MAY','MAY')
-	txt=txt.replace('JUNE','JUN')
-	txt=txt.replace('JULY','JUL')
-	txt=txt.replace('AUGUST','AUG')
-	txt=txt.replace('SEPTEMBER','SEP')
-	txt=txt.replace('OCTOBER','OCT')
-	txt=txt.replace('NOVEMBER','NOV')
-	txt=txt.replace('DECEMBER','DEC')
-	txt=txt.replace('ABOUT','ABT')
-	txt=txt.replace('.','')
-	
-	return txt
+	return parse_date(txt).get_standardised()
 
 # This routine returns a name in a nice standaradised format
 def GetStandardisedName(ind):
@@ -56,47 +45,45 @@ def LoadGEDCOMs(file_path_1,file_path_2,root_person_criteria):
 	global root_person_2
 	global gedcom_parser_1
 	global gedcom_parser_2
+	global relationship_graph_1
+	global relationship_graph_2
 	root_person_1 = ''
 	root_person_2 = ''
 	# Initialize the parser
 	gedcom_parser_1 = Parser()
 	gedcom_parser_2 = Parser()
 	
+	# Re-use the parsed trees of unchanged files from earlier runs
+	snapshot_cache = None
+	if CACHE_DIR:
+		snapshot_cache = SnapshotCache(CACHE_DIR)
+	
 	# Parse your file
-	gedcom_parser_1.parse_file(file_path_1, False)
-	root_child_elements_1 = gedcom_parser_1.get_root_child_elements()
-
-	gedcom_parser_2.parse_file(file_path_2, False)
-	root_child_elements_2 = gedcom_parser_2.get_root_child_elements()
+	gedcom_parser_1.parse_file(file_path_1, False, cache=snapshot_cache)
+	gedcom_parser_2.parse_file(file_path_2, False, cache=snapshot_cache)
 
-	# Iterate through all root child elements
-	for element in root_child_elements_1:
+	# Resolve parents, spouses and children of everyone once, rather than for every pair checked
+	relationship_graph_1 = gedcom_parser_1.get_relationship_graph()
+	relationship_graph_2 = gedcom_parser_2.get_relationship_graph()
 
-		# Is the `element` an actual `IndividualElement`? (Allows usage of extra functions such as `surname_match` and `get_name`.)
-		if isinstance(element, IndividualElement):
-			if element.criteria_match(root_person_criteria):
-				root_person_1 = element
-				exit
+	# Find the first individual matching the criteria in each file
+	matches_1 = gedcom_parser_1.find_individuals(root_person_criteria, limit=1)
+	if matches_1:
+		root_person_1 = matches_1[0]
 
-	# Iterate through all root child elements
-	for element in root_child_elements_2:
-
-		# Is the `element` an actual `IndividualElement`? (Allows usage of extra functions such as `surname_match` and `get_name`.)
-		if isinstance(element, IndividualElement):
-			if element.criteria_match(root_person_criteria):
-				root_person_2 = element
-				exit
+	matches_2 = gedcom_parser_2.find_individuals(root_person_criteria, limit=1)
+	if matches_2:
+		root_person_2 = matches_2[0]
 
 # This routine does a simple comparison.  Used to decide if close enough to consider for more detailed matching
+# Surnames are compared by their Soundex code, so spelling variants such as Tiffany and Tiffney still match
 def SimpleCompare(ind1, ind2):
-	(firstnames_1,surname_1)=ind1.get_name()
-	(firstnames_2,surname_2)=ind2.get_name()
-	initial_1=firstnames_1[:1]
-	initial_2=firstnames_2[:1]
+	key_1=get_blocking_key(ind1)
+	key_2=get_blocking_key(ind2)
 	
-	if DEBUGMODE>4: print('   -->SimpleCompare: '+initial_1+' '+surname_1+' vs '+initial_2+' '+surname_2)
+	if DEBUGMODE>4: print('   -->SimpleCompare: '+key_1[1]+' '+key_1[0]+' vs '+key_2[1]+' '+key_2[0])
 	
-	return (initial_1==initial_2) and (surname_1==surname_2)
+	return key_1==key_2
 
 # This route does detailed comparison of an individual and outputs findings
 def CompareIndividuals(ind1, ind2):
@@ -107,76 +94,22 @@ def CompareIndividuals(ind1, ind2):
 	if isinstance(ind1, IndividualElement)==False or isinstance(ind2, IndividualElement)==False:
 		if DEBUGMODE>2: print('>>>Comparing-> One or other is not an individual record')
 		return 0
-	else:
-		retvalue = 0
-	
-	# extract the names
-	(firstname_1, surname_1)=ind1.get_name()
-	initial_1 = firstname_1[:1]
-	(firstname_2, surname_2)=ind2.get_name()
-	initial_2 = firstname_2[:1]
 	
 	if DEBUGMODE>0: print('>>>Comparing-> '+GetStandardisedName(ind1)+' vs '+GetStandardisedName(ind2))
 	
-	# next check the basics: Surname, Initial, Gender, YoB, YoD - 10% each
-	if ind1.get_gender()==ind2.get_gender(): 
-		retvalue=retvalue+0.1 
-	else: 
-		output+=' - GENDER MIS-MATCH : '+ind1.get_gender()+' vs '+ind2.get_gender()+'\n'
-	
-	if surname_1==surname_2: 
-		retvalue=retvalue+0.1
-	else: 
-		output+=' - SURNAME MIS-MATCH : '+surname_1+' vs '+surname_2+'\n'
-
-	# next check forename matches - plus 20% if matches exactly, plus 10% if just initial matches
-	if firstname_1==firstname_2: 
-		retvalue=retvalue+0.2 
-	elif initial_1==initial_2: 
-		retvalue=retvalue+0.1  
-		output+=' - FULL NAME MIS-MATCH, FIRST INITIAL OK : '+firstname_1+' vs '+firstname_2+'\n'
-	else: 
-		output+=' - FULL NAME MIS-MATCH : '+firstname_1+' vs '+firstname_2+'\n'
-	
-	# check birth years
-	YoB_1=ind1.get_birth_year()
-	YoB_2=ind2.get_birth_year()
-	if YoB_1==YoB_2:
-		retvalue=retvalue+0.1 
-	elif YoB_1==-1 or YoB_2==-1: 
-		retvalue+=0.05
-		output+=' - BIRTH YEAR KNOWN VS UNKNOWN : '+str(YoB_1)+' vs '+str(YoB_2)+'\n'
-	else: 
-		output+=' - BIRTH YEAR MIS-MATCH : '+str(YoB_1)+' vs '+str(YoB_2)+'\n'
-		
-	# check death years
-	YoD_1=ind1.get_death_year()
-	YoD_2=ind2.get_death_year()
-	if YoD_1==YoD_2: 
-		retvalue=retvalue+0.1 
-	elif YoD_1==-1 or YoD_2==-1: 
-		retvalue+=0.05
-		output+=' - DEATH YEAR KNOWN VS UNKNOWN : '+str(YoD_1)+' vs '+str(YoD_2)+'\n'
-	else: 
-		output+=' - DEATH YEAR MIS-MATCH : '+str(YoD_1)+' vs '+str(YoD_2)+'\n'
+	# check the basics: Surname, Initial, Gender, YoB, YoD - 10% each (20% for the full forename)
+	# All of these must match (i.e. 40% confidence) to continue, then DoB and DoD add 20% each
+	findings=[]
+	if scorer is None:
+		retvalue=score_individuals(ind1, ind2, findings)
+	else:
+		retvalue=scorer.score(ind1, ind2, findings)
+	output+=''.join(findings)
 	
-#	# All of the above must match (i.e. 40% confidence) to continue, otherwise reject the match
-	if retvalue<0.4: 
-		if DEBUGMODE>0: print('>>>Comparing-> Match insufficient at '+str(retvalue))
+	if retvalue==0: 
+		if DEBUGMODE>0: print('>>>Comparing-> Match insufficient')
 		return 0
 	
-	# next check DoB set and matches - plus 20% if matches exactly
-	if GetStandardisedDate(ind1.get_birth_date())==GetStandardisedDate(ind2.get_birth_date()): 
-		retvalue=retvalue+0.2 
-	else: 
-		output+=' - DOB MIS-MATCH : '+ind1.get_birth_date()+' vs '+ind2.get_birth_date()+'\n'
-	
-	# next check DoB set and matches - plus 20% if matches exactly
-	if GetStandardisedDate(ind1.get_death_date())==GetStandardisedDate(ind2.get_death_date()): 
-		retvalue=retvalue+0.2 
-	else: 
-		output+=' - DOD MIS-MATCH : '+ind1.get_death_date()+' vs '+ind2.get_death_date()+'\n'
-	
 	if retvalue>=1:
 		perfect_matches += 1
 		output+=' + INDIVIDUAL IS A PERFECT MATCH!\n'
@@ -186,22 +119,57 @@ def CompareIndividuals(ind1, ind2):
 
 # This routine adds 2 individuals to the list for checking, first checking that they are not already there and have not already been checked!
 def AddToList(ind_1, ind_2, sep):
-	global list_of_checked
-	global list_of_matches
-	global list_of_matches_sep
-	global SCOPE_SEP
-
-	if sep>SCOPE_SEP:
-		return False
-	if (ind_1,ind_2) in list_of_checked: 
-		return False
-	else:
-		if (ind_1,ind_2) in list_of_matches: 
-			return False 
-		else:
-			list_of_matches = [(ind_1,ind_2)] + list_of_matches
-			list_of_matches_sep = [sep] + list_of_matches_sep
-			return True
+	return frontier.add(ind_1, ind_2, sep)
+
+# This routine matches all individuals of both files one-to-one, rather than only those reachable from the root people
+def CompareAllIndividuals():
+	global output
+	global perfect_matches
+	global scorer
+	individuals_1=gedcom_parser_1.find_individuals(Criteria())
+	individuals_2=gedcom_parser_2.find_individuals(Criteria())
+	if DEBUGMODE>1: print('>>>Matching All -> '+str(len(individuals_1))+' vs '+str(len(individuals_2))+' individuals')
+	
+	# block, score and assign the pairs in one go
+	if PARALLEL_WORKERS is not None:
+		scorer=PairScorer(individuals_1, individuals_2, PARALLEL_WORKERS)
+	matches=match_individuals(individuals_1, individuals_2, refine=MATCH_REFINE, scorer=scorer)
+	
+	# work out the findings of all matches up front in the same pool when scoring in parallel
+	if scorer is not None:
+		scorer.prefetch([(ind_1,ind_2) for (ind_1,ind_2,score) in matches])
+		scorer.close()
+	
+	perfect_matches=0
+	count_issues=0
+	matched_1=set()
+	matched_2=set()
+	for (ind_1,ind_2,score) in matches:
+		matched_1.add(ind_1.get_pointer())
+		matched_2.add(ind_2.get_pointer())
+		output=GetStandardisedName(ind_1)+' : Match Score='+str(round(score,2))+'\n'
+		CompareIndividuals(ind_1,ind_2)
+		f=output.find(' - ')
+		if f!=-1: count_issues+=1
+		if OUTPUT_ALL or f!=-1:
+			print(output)
+	
+	# list everyone left over on either side
+	for ind in individuals_1:
+		if ind.get_pointer() not in matched_1:
+			print(' - NOT FOUND IN GEDCOM 2 : '+GetStandardisedName(ind))
+	for ind in individuals_2:
+		if ind.get_pointer() not in matched_2:
+			print(' - NOT FOUND IN GEDCOM 1 : '+GetStandardisedName(ind))
+	
+	print('\nAll individuals compared. Thank you!')
+	print('  -- Individuals in GEDCOM 1: '+str(len(individuals_1)))
+	print('  -- Individuals in GEDCOM 2: '+str(len(individuals_2)))
+	print('  -- Individuals matched: '+str(len(matches)))
+	print('      -- Perfect Matches: '+str(perfect_matches))
+	print('      -- Partial Matches: '+str(len(matches)-perfect_matches))
+	print('      -- With Issues:     '+str(count_issues))
+	print('')
 
 ###############   MAIN PROGRAM    ################## 
  
@@ -217,9 +185,35 @@ SCOPE_ALL=False
 #### TODO: Allow input of max separation (SCOPE_SEP)
 SCOPE_SEP=99
 
+# Compare the most confident pairs first rather than the latest found (SCOPE_BEST_FIRST)
+SCOPE_BEST_FIRST=False
+
+# Compare all pairs of one degree of separation before the next, rather than the latest found first (SCOPE_BREADTH_FIRST)
+SCOPE_BREADTH_FIRST=False
+
+# Skip pairs scoring less than this when found, e.g. 0.4 to prune weak branches early (None to check all)
+SCOPE_MIN_CONFIDENCE=None
+
+# Stop after checking this many pairs or running for this many seconds (None for no limit)
+SCOPE_MAX_PAIRS=None
+SCOPE_MAX_SECONDS=None
+
 #### TODO: Allow input of outputting all individuals or just those with issues (OUTPUT_ALL)
 OUTPUT_ALL=False
 
+#### TODO: Allow input of matching everyone in both files, rather than relatives of the root person only (MATCH_ALL)
+MATCH_ALL=False
+
+# Refine the matches within groups of similar names to the best overall assignment when matching everyone (slower)
+MATCH_REFINE=False
+
+# Score pairs of individuals in this many processes, e.g. 4 for large trees (None to score them one by one)
+# Used when matching everyone, and by the tree checks when comparing breadth first, a degree of separation at a time
+PARALLEL_WORKERS=None
+
+# Directory for snapshots of parsed GEDCOMs, so unchanged files are not parsed again on the next run (None to disable)
+CACHE_DIR='myfiles/.gedcom_cache'
+
 #### TODO: Check marriage records of individuals (dates/places)
 #### TODO: Check places of birth / death for individuals
 
@@ -238,6 +232,12 @@ LoadGEDCOMs('myfiles/ancestry.ged','myfiles/wikitree.ged','surname=Tiffany:name=
 #LoadGEDCOMs('myfiles/ancestry.ged','myfiles/wikitree.ged','surname=Lyon:name=Keith Frederick:gender=M:birth_year=1926')
 #LoadGEDCOMs('myfiles/wikitree.ged','myfiles/ancestry.ged','surname=Tiffany:name=Leonard:gender=M')
 
+scorer = None
+
+if MATCH_ALL:
+	CompareAllIndividuals()
+	exit()
+
 if not isinstance(root_person_1, IndividualElement):
 	print('Could not find individual in GEDCOM 1!')
 	if not isinstance(root_person_2, IndividualElement):
@@ -247,11 +247,10 @@ if not isinstance(root_person_1, IndividualElement):
 print('Starting with: '+GetStandardisedName(root_person_1))
 
 # Start iterating through parents and relations to check data matches
-t=(root_person_1,root_person_2)
-list_of_matches = [t]
-list_of_matches_sep =[0]
-list_of_checked = []
-list_of_checked_sep =[]
+frontier = ComparisonFrontier(SCOPE_SEP, SCOPE_BEST_FIRST, SCOPE_MIN_CONFIDENCE, SCOPE_MAX_PAIRS, SCOPE_MAX_SECONDS, SCOPE_BREADTH_FIRST)
+if PARALLEL_WORKERS is not None and SCOPE_BREADTH_FIRST:
+	scorer = PairScorer(gedcom_parser_1.find_individuals(Criteria()), gedcom_parser_2.find_individuals(Criteria()), PARALLEL_WORKERS)
+AddToList(root_person_1, root_person_2, 0)
 perfect_matches = 0
 non_matches = 0
 max_sep=0
@@ -259,18 +258,14 @@ count_issues = 0
 
 if DEBUGMODE>1: print('>>>LOOP-> Start')
 
-while len(list_of_matches)>0:
+while not frontier.is_done():
 	output = ''
-	# take the first item out of the list and add it to the checked list
-	t=list_of_matches[0]
-	list_of_matches=list_of_matches[1:]
-	(ind_1,ind_2)=t
-	list_of_checked = [(ind_1,ind_2)] + list_of_checked
-
-	# determine degree of separation for this individual, remove it from the matches list and add to the checked list
-	this_sep = list_of_matches_sep[0]
-	list_of_matches_sep = list_of_matches_sep[1:]
-	list_of_checked_sep = [this_sep] + list_of_checked_sep
+	# take the next pair to check and its degree of separation
+	(ind_1,ind_2,this_sep)=frontier.pop()
+	
+	# on reaching the next degree of separation, score all of its pairs in one go
+	if scorer is not None and not scorer.is_prefetched(ind_1, ind_2):
+		scorer.prefetch([(ind_1,ind_2)]+frontier.get_level())
 
 	if this_sep>max_sep: max_sep=this_sep
 
@@ -292,38 +287,31 @@ while len(list_of_matches)>0:
 			# Add Spouse
 			if DEBUGMODE>1: print('>>>Checking Spouse   -> Looking...')
 			marriages=0
-			fam_1=gedcom_parser_1.get_families(ind_1)
-			fam_2=gedcom_parser_2.get_families(ind_2)
-			for fam in fam_1:
-				members_1=gedcom_parser_1.get_family_members(fam,"PARENTS")
-				for t in members_1:
-					if t.is_identical(ind_1)==False: 
-						if DEBUGMODE>2: print('>>>Checking Spouse   -> GEDCOM1 Spouse found: '+str(t.get_name()))
-						marriages += 1
-						tmp_1 = t
-						
-						if DEBUGMODE>3: print('>>>Checking Spouse   -> Comparing to GEDCOM2...')
-						found=0
-						
-						for fam_check in fam_2:
-							members_2=gedcom_parser_2.get_family_members(fam_check,"PARENTS")
-							for t2 in members_2:
-								if t2.is_identical(ind_2)==False: 
-									if DEBUGMODE>3: print('>>>Checking Spouse   -> GEDCOM2 Simple Compare: '+str(tmp_1.get_name())+' vs '+str(t2.get_name()))
-									
-									if SimpleCompare(tmp_1,t2):
-										found=1
-										tmp_2 = t2
-									
-										if DEBUGMODE>2: print('>>>Checking Spouse   -> GEDCOM2 Match found: '+str(tmp_2.get_name()))
-						
-										if AddToList(tmp_1,tmp_2, this_sep+1):
-											if DEBUGMODE>0: print('>>>Checking Spouse   -> Added : '+str(tmp_1.get_name())+' and '+str(tmp_2.get_name()))
-										else:
-											if DEBUGMODE>0: print('>>>Checking Spouse   -> Dupe  : '+str(tmp_1.get_name())+' and '+str(tmp_2.get_name()))
-						
-						if found==0:
-							output+=' - CANNOT MATCH SPOUSE : '+GetStandardisedName(tmp_1)+'\n'
+			spouses_2=relationship_graph_2.get_spouses(ind_2)
+			for t in relationship_graph_1.get_spouses(ind_1):
+				if DEBUGMODE>2: print('>>>Checking Spouse   -> GEDCOM1 Spouse found: '+str(t.get_name()))
+				marriages += 1
+				tmp_1 = t
+				
+				if DEBUGMODE>3: print('>>>Checking Spouse   -> Comparing to GEDCOM2...')
+				found=0
+				
+				for t2 in spouses_2:
+					if DEBUGMODE>3: print('>>>Checking Spouse   -> GEDCOM2 Simple Compare: '+str(tmp_1.get_name())+' vs '+str(t2.get_name()))
+					
+					if SimpleCompare(tmp_1,t2):
+						found=1
+						tmp_2 = t2
+					
+						if DEBUGMODE>2: print('>>>Checking Spouse   -> GEDCOM2 Match found: '+str(tmp_2.get_name()))
+		
+						if AddToList(tmp_1,tmp_2, this_sep+1):
+							if DEBUGMODE>0: print('>>>Checking Spouse   -> Added : '+str(tmp_1.get_name())+' and '+str(tmp_2.get_name()))
+						else:
+							if DEBUGMODE>0: print('>>>Checking Spouse   -> Dupe  : '+str(tmp_1.get_name())+' and '+str(tmp_2.get_name()))
+				
+				if found==0:
+					output+=' - CANNOT MATCH SPOUSE : '+GetStandardisedName(tmp_1)+'\n'
 			
 			marriages_1=gedcom_parser_1.get_marriages(ind_1)
 			marriages_2=gedcom_parser_2.get_marriages(ind_2)
@@ -341,8 +329,8 @@ while len(list_of_matches)>0:
 
 		# Add Parents
 		if DEBUGMODE>1: print('>>>Checking Parents  -> Looking...')
-		list_1=gedcom_parser_1.get_parents(ind_1)
-		list_2=gedcom_parser_2.get_parents(ind_2)
+		list_1=relationship_graph_1.get_parents(ind_1)
+		list_2=relationship_graph_2.get_parents(ind_2)
 		parents=0
 		for tmp_1 in list_1:
 			found=0
@@ -369,28 +357,23 @@ while len(list_of_matches)>0:
 			if DEBUGMODE>1: print('>>>Checking Children -> Looking...')
 
 			count_kids=0
-			list_1=gedcom_parser_1.get_families(ind_1)
-			list_2=gedcom_parser_2.get_families(ind_2)
-			for fam_1 in list_1:
-				members_1=gedcom_parser_1.get_family_members(fam_1,"CHIL")
-				for tmp_1 in members_1:
-					if tmp_1.is_child():
-						count_kids+=1
-						if DEBUGMODE>2: print('>>>Checking Children -> '+str(tmp_1.get_name()))
-						found=0
-						
-						for fam_2 in list_2:
-							members_2=gedcom_parser_2.get_family_members(fam_2,"CHIL")
-							for tmp_2 in members_2:
-								if DEBUGMODE>2: print('>>>Checking Children -> Simple Compare : '+str(tmp_2.get_name()))
-								if SimpleCompare(tmp_1,tmp_2):
-									found=1
-									if AddToList(tmp_1,tmp_2, this_sep+1):
-										if DEBUGMODE>0: print('>>>Checking Children -> Added : '+str(tmp_1.get_name())+' and '+str(tmp_2.get_name()))
-									else:
-										if DEBUGMODE>1: print('>>>Checking Children -> Dupe  : '+str(tmp_1.get_name())+' and '+str(tmp_2.get_name()))
-						if found==0:
-							output+=' - CHILD NOT FOUND : '+GetStandardisedName(tmp_1)+'\n'
+			list_2=relationship_graph_2.get_children(ind_2)
+			for tmp_1 in relationship_graph_1.get_children(ind_1):
+				if tmp_1.is_child():
+					count_kids+=1
+					if DEBUGMODE>2: print('>>>Checking Children -> '+str(tmp_1.get_name()))
+					found=0
+					
+					for tmp_2 in list_2:
+						if DEBUGMODE>2: print('>>>Checking Children -> Simple Compare : '+str(tmp_2.get_name()))
+						if SimpleCompare(tmp_1,tmp_2):
+							found=1
+							if AddToList(tmp_1,tmp_2, this_sep+1):
+								if DEBUGMODE>0: print('>>>Checking Children -> Added : '+str(tmp_1.get_name())+' and '+str(tmp_2.get_name()))
+							else:
+								if DEBUGMODE>1: print('>>>Checking Children -> Dupe  : '+str(tmp_1.get_name())+' and '+str(tmp_2.get_name()))
+					if found==0:
+						output+=' - CHILD NOT FOUND : '+GetStandardisedName(tmp_1)+'\n'
 			if count_kids==0: output+=' = No Children\n'
 	
 	f=output.find(' - ')
@@ -398,12 +381,18 @@ while len(list_of_matches)>0:
 	if OUTPUT_ALL or f!=-1:
 		print(output)
 
+if scorer is not None: scorer.close()
+
 # Finish up by summarising what we have done
 print('\nAll tree checks completed. Thank you!')
-print('  -- Individuals checked: '+str(len(list_of_checked)))
+print('  -- Individuals checked: '+str(frontier.get_checked_count()))
 print('      -- Perfect Matches: '+str(perfect_matches))
-print('      -- Partial Matches: '+str(len(list_of_checked)-perfect_matches-non_matches))
+print('      -- Partial Matches: '+str(frontier.get_checked_count()-perfect_matches-non_matches))
 print('      -- Non Matches:     '+str(non_matches))
 print('      -- Max Separation:  '+str(max_sep))
 print('      -- With Issues:     '+str(count_issues))
+if frontier.get_pruned_count()>0:
+	print('  -- Pairs skipped as unlikely: '+str(frontier.get_pruned_count()))
+if len(frontier)>0:
+	print('  -- Stopped early, pairs left unchecked: '+str(len(frontier)))
 print('')
@@ -29,7 +29,15 @@ __all__ = [
     # Subpackages
     "element",
     # Modules
+    "blocking",
+    "cache",
+    "criteria",
+    "date",
     "helpers",
+    "index",
+    "matching",
     "parser",
+    "relationship",
+    "store",
     "tags"
 ]
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+# Python GEDCOM Parser
+#
+# Copyright (C) 2018 Damon Brodie (damon.brodie at gmail.com)
+# Copyright (C) 2018-2019 Nicklas Reincke (contact at reynke.com)
+# Copyright (C) 2016 Andreas Oberritter
+# Copyright (C) 2012 Madeleine Price Ball
+# Copyright (C) 2005 Daniel Zappala (zappala at cs.byu.edu)
+# Copyright (C) 2005 Brigham Young University
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Further information about the license: http://www.gnu.org/licenses/gpl-2.0.html
+
+import unicodedata
+
+# Soundex digits of the consonants, vowels and the letters H, W and Y have none
+_SOUNDEX_CODES = {}
+for _letters, _digit in (("BFPV", "1"), ("CGJKQSXZ", "2"), ("DT", "3"), ("L", "4"), ("MN", "5"), ("R", "6")):
+    for _letter in _letters:
+        _SOUNDEX_CODES[_letter] = _digit
+
+
+def soundex(name):
+    """Returns the American Soundex code of a name, e.g. `T150` for both Tiffany and Tiffney
+
+    Accents and other combining marks are removed first, so that Östberg is coded like
+    Ostberg. Characters other than the letters A to Z are then ignored. Names without any such
+    letter return an empty string.
+
+    :type name: str
+    :rtype: str
+    """
+    name = ''.join(
+        character for character in unicodedata.normalize('NFKD', name) if not unicodedata.combining(character))
+    letters = [letter for letter in name.upper() if 'A' <= letter <= 'Z']
+    if not letters:
+        return ""
+
+    code = letters[0]
+    last_digit = _SOUNDEX_CODES.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter, "")
+        if digit and digit != last_digit:
+            code += digit
+            if len(code) == 4:
+                break
+        # H and W do not separate letters with the same digit, vowels do
+        if letter not in "HW":
+            last_digit = digit
+    return (code + "000")[:4]
+
+
+def get_surname_code(surname):
+    """Returns the code surnames are blocked by: their Soundex code, or the case-folded surname
+
+    Soundex is only used for surnames made of letters, spaces, hyphens and apostrophes with at
+    least one letter from A to Z. Other surnames, e.g. with digits or in other scripts, are only
+    blocked with the same surname.
+
+    :type surname: str
+    :rtype: str
+    """
+    code = ""
+    if all(character.isalpha() or character in " -'." for character in surname):
+        code = soundex(surname)
+    return code or ' '.join(surname.split()).casefold()
+
+
+def get_blocking_key(individual):
+    """Returns the key of the block of an individual: the code of the surname and the first initial
+    :type individual: IndividualElement
+    :rtype: tuple
+    """
+    given_name, surname = individual.get_name()
+    return get_surname_code(surname), given_name[:1].upper()
+
+
+def get_birth_decade(individual):
+    """Returns the decade an individual was born in, e.g. 185 for 1853, or `None` if not known
+    :type individual: IndividualElement
+    :rtype: int
+    """
+    birth_year = individual.get_birth_year()
+    if birth_year == -1:
+        return None
+    return birth_year // 10
+
+
+class BlockingIndex(object):
+    """Individuals grouped into blocks of possible matches
+
+    Individuals are grouped by `get_blocking_key()`, so spelling variants of a surname sharing a
+    Soundex code end up in the same block. Within a block, individuals are grouped by the decade
+    they were born in. Finding the candidates for a match with an individual of another file
+    is a lookup of its block and of the neighbouring decades.
+    """
+
+    def __init__(self, individuals):
+        """:type individuals: list of IndividualElement"""
+        self.__blocks = {}
+        for individual in individuals:
+            decades = self.__blocks.setdefault(get_blocking_key(individual), {})
+            decades.setdefault(get_birth_decade(individual), []).append(individual)
+
+    def __len__(self):
+        """Returns the number of blocks
+        :rtype: int
+        """
+        return len(self.__blocks)
+
+    def get_keys(self):
+        """:rtype: list of tuple"""
+        return list(self.__blocks)
+
+    def get_block(self, key):
+        """Returns the individuals of a block, in the order they were indexed
+        :type key: tuple
+        :rtype: list of IndividualElement
+        """
+        decades = self.__blocks.get(key)
+        if decades is None:
+            return []
+        if len(decades) == 1:
+            return list(next(iter(decades.values())))
+        return [individual for decade in decades.values() for individual in decade]
+
+    def get_candidates(self, individual, decade_tolerance=1):
+        """Returns the individuals of the block of an individual that may be the same person
+
+        With a `decade_tolerance`, only individuals born up to that many decades before or after
+        the individual, or with unknown birth years, are returned. Use `None` to return the whole
+        block. Individuals with unknown birth years match any decade.
+
+        :type individual: IndividualElement
+        :type decade_tolerance: int
+        :rtype: list of IndividualElement
+        """
+        decades = self.__blocks.get(get_blocking_key(individual))
+        if decades is None:
+            return []
+
+        decade = get_birth_decade(individual)
+        if decade_tolerance is None or decade is None:
+            return [candidate for candidates in decades.values() for candidate in candidates]
+
+        candidates = []
+        for candidate_decade, decade_candidates in decades.items():
+            if candidate_decade is None or abs(candidate_decade - decade) <= decade_tolerance:
+                candidates.extend(decade_candidates)
+        return candidates
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+# Python GEDCOM Parser
+#
+# Copyright (C) 2018 Damon Brodie (damon.brodie at gmail.com)
+# Copyright (C) 2018-2019 Nicklas Reincke (contact at reynke.com)
+# Copyright (C) 2016 Andreas Oberritter
+# Copyright (C) 2012 Madeleine Price Ball
+# Copyright (C) 2005 Daniel Zappala (zappala at cs.byu.edu)
+# Copyright (C) 2005 Brigham Young University
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Further information about the license: http://www.gnu.org/licenses/gpl-2.0.html
+
+import hashlib
+import os
+import pickle
+import tempfile
+import zlib
+
+# Bump when the layout of the snapshot data written by the parser changes
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_FILE_EXTENSION = ".snapshot"
+
+
+class SnapshotCache(object):
+    """Directory of parsed GEDCOM trees, used by `Parser.parse_file()` to skip parsing unchanged files
+
+    A snapshot is keyed by the absolute path, size and modification time of the GEDCOM file
+    and, when `hash_content` is set, by a hash of its content as well. Snapshots are pickled and
+    zlib-compressed data written by the parser. Whenever the total size of the directory exceeds
+    `max_size` bytes, the least recently used snapshots are deleted.
+    """
+
+    def __init__(self, directory, max_size=512 * 1024 * 1024, hash_content=False):
+        """Initialize a snapshot cache, creating its directory if necessary
+
+        :type directory: str
+        :type max_size: int
+        :type hash_content: bool
+        """
+        self.__directory = directory
+        self.__max_size = max_size
+        self.__hash_content = hash_content
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def get_directory(self):
+        """Returns the directory the snapshots are stored in
+        :rtype: str
+        """
+        return self.__directory
+
+    def get_key(self, file_path, strict=True):
+        """Returns the cache key of a GEDCOM file in its current state
+        :type file_path: str
+        :type strict: bool
+        :rtype: str
+        """
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+
+        key = hashlib.sha1()
+        key.update(file_path.encode('utf-8'))
+        key.update(('\0%d\0%d\0%d\0%d' % (stat.st_size, stat.st_mtime_ns, strict, SNAPSHOT_VERSION)).encode('ascii'))
+
+        if self.__hash_content:
+            with open(file_path, 'rb') as gedcom_file:
+                for block in iter(lambda: gedcom_file.read(1 << 20), b''):
+                    key.update(block)
+
+        return key.hexdigest()
+
+    def load(self, file_path, strict=True):
+        """Returns the snapshot data stored for a GEDCOM file, or `None` if there is none
+
+        Unreadable snapshots are treated as missing, and snapshots that cannot be decoded are
+        removed.
+
+        :type file_path: str
+        :type strict: bool
+        :rtype: dict
+        """
+        snapshot_path = self.__get_snapshot_path(self.get_key(file_path, strict))
+
+        try:
+            with open(snapshot_path, 'rb') as snapshot_file:
+                data = snapshot_file.read()
+        except EnvironmentError:
+            return None
+
+        try:
+            snapshot = pickle.loads(zlib.decompress(data))
+        except Exception:
+            # Truncated or corrupt data can fail in many ways while unpickling
+            try:
+                os.remove(snapshot_path)
+            except EnvironmentError:
+                pass
+            return None
+
+        if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+            return None
+
+        # Mark the snapshot as recently used
+        os.utime(snapshot_path, None)
+
+        return snapshot
+
+    def store(self, file_path, snapshot, strict=True):
+        """Stores snapshot data for a GEDCOM file and evicts old snapshots if the cache is too big
+        :type file_path: str
+        :type snapshot: dict
+        :type strict: bool
+        """
+        snapshot_path = self.__get_snapshot_path(self.get_key(file_path, strict))
+
+        snapshot = dict(snapshot, version=SNAPSHOT_VERSION)
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.__directory)
+        try:
+            with os.fdopen(descriptor, 'wb') as snapshot_file:
+                snapshot_file.write(zlib.compress(pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL), 1))
+            os.replace(temporary_path, snapshot_path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Deletes the least recently used snapshots until the cache is no bigger than its maximum size"""
+        snapshots = []
+        total_size = 0
+
+        for file_name in os.listdir(self.__directory):
+            if not file_name.endswith(SNAPSHOT_FILE_EXTENSION):
+                continue
+            snapshot_path = os.path.join(self.__directory, file_name)
+            try:
+                stat = os.stat(snapshot_path)
+            except EnvironmentError:
+                continue
+            snapshots.append((stat.st_mtime, snapshot_path, stat.st_size))
+            total_size += stat.st_size
+
+        snapshots.sort()
+        for last_used, snapshot_path, size in snapshots:
+            if total_size <= self.__max_size:
+                break
+            try:
+                os.remove(snapshot_path)
+            except EnvironmentError:
+                continue
+            total_size -= size
+
+    def clear(self):
+        """Deletes all snapshots"""
+        for file_name in os.listdir(self.__directory):
+            if file_name.endswith(SNAPSHOT_FILE_EXTENSION):
+                os.remove(os.path.join(self.__directory, file_name))
+
+    def __get_snapshot_path(self, key):
+        """:rtype: str"""
+        return os.path.join(self.__directory, key + SNAPSHOT_FILE_EXTENSION)
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+
+# Python GEDCOM Parser
+#
+# Copyright (C) 2018 Damon Brodie (damon.brodie at gmail.com)
+# Copyright (C) 2018-2019 Nicklas Reincke (contact at reynke.com)
+# Copyright (C) 2016 Andreas Oberritter
+# Copyright (C) 2012 Madeleine Price Ball
+# Copyright (C) 2005 Daniel Zappala (zappala at cs.byu.edu)
+# Copyright (C) 2005 Brigham Young University
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Further information about the license: http://www.gnu.org/licenses/gpl-2.0.html
+
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+import gedcom.tags
+
+# Tags of the lines an `IndividualIndex` is built from
+INDIVIDUAL_INDEX_TAGS = frozenset([
+    gedcom.tags.GEDCOM_TAG_INDIVIDUAL,
+    gedcom.tags.GEDCOM_TAG_NAME,
+    gedcom.tags.GEDCOM_TAG_GIVEN_NAME,
+    gedcom.tags.GEDCOM_TAG_SURNAME,
+    gedcom.tags.GEDCOM_TAG_BIRTH,
+    gedcom.tags.GEDCOM_TAG_DEATH,
+    gedcom.tags.GEDCOM_TAG_DATE,
+])
+
+# Number of distinct criteria strings `Criteria.compile()` remembers
+CRITERIA_CACHE_SIZE = 256
+
+# Name patterns made of letters and digits only can be looked up by given name tokens
+_WORD_REGEX = re.compile(r'^\w+$')
+
+
+class InvalidCriteriaError(ValueError):
+    pass
+
+
+class Criteria(object):
+    """A compiled search criteria string, used as a predicate on individuals
+
+    Criteria strings are colon-separated lists of `key=value` items, see
+    `IndividualElement.criteria_match()` for the supported keys. An individual matches if it
+    matches every item. Name patterns are compiled once, and years and ranges are parsed once,
+    when the criteria are compiled. Unknown keys are ignored, and items with years that are not
+    numbers never match.
+    """
+
+    def __init__(self, criteria=None):
+        """Compiles a criteria string, or initializes criteria matching every individual
+
+        Raises an `InvalidCriteriaError` if an item is not of the form `key=value`. Use
+        `compile()` to reuse criteria compiled earlier.
+
+        :type criteria: str
+        """
+        self.__surname_patterns = []
+        self.__given_name_patterns = []
+        self.__genders = []
+        self.__birth_dates = []
+        self.__birth_ranges = []
+        self.__death_ranges = []
+        self.__matches_nothing = False
+
+        if criteria is not None:
+            for criterion in criteria.split(':'):
+                try:
+                    key, value = criterion.split('=')
+                except ValueError:
+                    raise InvalidCriteriaError("Criterion %r is not of the form key=value" % criterion)
+                self.__add(key, value)
+
+    @classmethod
+    def compile(cls, criteria):
+        """Compiles a criteria string, or returns the compiled criteria if given those
+
+        Compiled criteria are cached, so compiling the same string again is cheap.
+
+        :type criteria: str or Criteria
+        :rtype: Criteria
+        """
+        if isinstance(criteria, Criteria):
+            return criteria
+        return _compile(criteria)
+
+    def __add(self, key, value):
+        """Adds a `key=value` item of a criteria string
+        :type key: str
+        :type value: str
+        """
+        if key == "surname":
+            self.__surname_patterns.append(re.compile(value, re.IGNORECASE))
+        elif key == "name":
+            self.__given_name_patterns.append(re.compile(value, re.IGNORECASE))
+        elif key == "gender":
+            self.__genders.append(value)
+        elif key == "birth_date":
+            self.__birth_dates.append(value)
+        elif key in ("birth", "birth_range", "death", "death_range"):
+            try:
+                if key.endswith("_range"):
+                    from_year, to_year = value.split('-')
+                    year_range = (int(from_year), int(to_year))
+                else:
+                    year_range = (int(value), int(value))
+            except ValueError:
+                self.__matches_nothing = True
+                return
+            if key.startswith("birth"):
+                self.__birth_ranges.append(year_range)
+            else:
+                self.__death_ranges.append(year_range)
+
+    def get_surname_patterns(self):
+        """:rtype: list of re.Pattern"""
+        return self.__surname_patterns
+
+    def get_given_name_patterns(self):
+        """:rtype: list of re.Pattern"""
+        return self.__given_name_patterns
+
+    def get_birth_range(self):
+        """Returns the range of birth years allowed by all items as a tuple (`int` from, `int` to), or `None`
+        :rtype: tuple
+        """
+        return self.__get_range(self.__birth_ranges)
+
+    def get_death_range(self):
+        """Returns the range of death years allowed by all items as a tuple (`int` from, `int` to), or `None`
+        :rtype: tuple
+        """
+        return self.__get_range(self.__death_ranges)
+
+    @staticmethod
+    def __get_range(year_ranges):
+        if not year_ranges:
+            return None
+        return max(year_range[0] for year_range in year_ranges), min(year_range[1] for year_range in year_ranges)
+
+    def matches_nothing(self):
+        """Checks if these criteria have an item no individual can match
+        :rtype: bool
+        """
+        return self.__matches_nothing
+
+    def matches(self, individual):
+        """Checks if an individual matches these criteria
+        :type individual: IndividualElement
+        :rtype: bool
+        """
+        if self.__matches_nothing:
+            return False
+
+        if self.__surname_patterns or self.__given_name_patterns:
+            given_name, surname = individual.get_name()
+            for pattern in self.__surname_patterns:
+                if not pattern.search(surname):
+                    return False
+            for pattern in self.__given_name_patterns:
+                if not pattern.search(given_name):
+                    return False
+
+        for gender in self.__genders:
+            if individual.get_gender() != gender:
+                return False
+
+        for birth_date in self.__birth_dates:
+            if individual.get_birth_date() != birth_date:
+                return False
+
+        if self.__birth_ranges:
+            birth_year = individual.get_birth_year()
+            for from_year, to_year in self.__birth_ranges:
+                if not from_year <= birth_year <= to_year:
+                    return False
+
+        if self.__death_ranges:
+            death_year = individual.get_death_year()
+            for from_year, to_year in self.__death_ranges:
+                if not from_year <= death_year <= to_year:
+                    return False
+
+        return True
+
+    __call__ = matches
+
+
+class IndividualIndex(object):
+    """Secondary indexes of individuals by surname, given name tokens, birth year and death year
+
+    Built once from a list of individuals, see `Parser.enable_individual_index()`. Individuals
+    are identified by their position in that list. `get_candidates()` narrows compiled
+    criteria down to the individuals that may match them by intersecting the indexes, without
+    looking at any individual.
+    """
+
+    def __init__(self, individuals):
+        """:type individuals: list of IndividualElement"""
+        self.__individuals = individuals
+        self.__surnames = {}
+        self.__normalised_surnames = {}
+        self.__given_name_tokens = {}
+
+        birth_years = []
+        death_years = []
+        for position, individual in enumerate(individuals):
+            given_name, surname = individual.get_name()
+            self.__surnames.setdefault(surname, array('l')).append(position)
+            self.__normalised_surnames.setdefault(_normalise_name(surname), set()).add(surname)
+            for token in set(given_name.split()):
+                self.__given_name_tokens.setdefault(token, array('l')).append(position)
+            birth_years.append((individual.get_birth_year(), position))
+            death_years.append((individual.get_death_year(), position))
+
+        birth_years.sort()
+        death_years.sort()
+        self.__birth_years = array('l', [year for year, _ in birth_years])
+        self.__birth_positions = array('l', [position for _, position in birth_years])
+        self.__death_years = array('l', [year for year, _ in death_years])
+        self.__death_positions = array('l', [position for _, position in death_years])
+
+    def __len__(self):
+        """:rtype: int"""
+        return len(self.__individuals)
+
+    def get_individual(self, position):
+        """:rtype: IndividualElement"""
+        return self.__individuals[position]
+
+    def find_surname(self, surname):
+        """Returns the individuals with a surname, ignoring case and surrounding spaces, in list order
+        :type surname: str
+        :rtype: list of IndividualElement
+        """
+        positions = set()
+        for indexed_surname in self.__normalised_surnames.get(_normalise_name(surname), ()):
+            positions.update(self.__surnames[indexed_surname])
+        return [self.__individuals[position] for position in sorted(positions)]
+
+    def find_given_name_token(self, token):
+        """Returns the individuals with a word of their given names equal to `token`, in list order
+        :type token: str
+        :rtype: list of IndividualElement
+        """
+        return [self.__individuals[position] for position in self.__given_name_tokens.get(token, ())]
+
+    def find_birth_years(self, from_year, to_year):
+        """Returns the individuals born from `from_year` to `to_year`, including both, in list order
+        :type from_year: int
+        :type to_year: int
+        :rtype: list of IndividualElement
+        """
+        positions = self.__get_year_positions(self.__birth_years, self.__birth_positions, (from_year, to_year))
+        return [self.__individuals[position] for position in sorted(positions)]
+
+    def find_death_years(self, from_year, to_year):
+        """Returns the individuals who died from `from_year` to `to_year`, including both, in list order
+        :type from_year: int
+        :type to_year: int
+        :rtype: list of IndividualElement
+        """
+        positions = self.__get_year_positions(self.__death_years, self.__death_positions, (from_year, to_year))
+        return [self.__individuals[position] for position in sorted(positions)]
+
+    def get_candidates(self, criteria):
+        """Returns the positions of the individuals that may match criteria in ascending order
+
+        Returns `None` if no item of the criteria can be answered from the indexes. Surname
+        patterns are matched against all distinct surnames; given name patterns only narrow the
+        candidates if they are a single word. Candidates still need to be checked with
+        `Criteria.matches()`.
+
+        :type criteria: Criteria
+        :rtype: list of int
+        """
+        position_sets = []
+
+        for pattern in criteria.get_surname_patterns():
+            positions = set()
+            for surname, surname_positions in self.__surnames.items():
+                if pattern.search(surname):
+                    positions.update(surname_positions)
+            position_sets.append(positions)
+
+        for pattern in criteria.get_given_name_patterns():
+            if _WORD_REGEX.match(pattern.pattern):
+                positions = set()
+                for token, token_positions in self.__given_name_tokens.items():
+                    if pattern.search(token):
+                        positions.update(token_positions)
+                position_sets.append(positions)
+
+        birth_range = criteria.get_birth_range()
+        if birth_range is not None:
+            position_sets.append(self.__get_year_positions(self.__birth_years, self.__birth_positions, birth_range))
+        death_range = criteria.get_death_range()
+        if death_range is not None:
+            position_sets.append(self.__get_year_positions(self.__death_years, self.__death_positions, death_range))
+
+        if not position_sets:
+            return None
+        position_sets.sort(key=len)
+        candidates = position_sets[0].intersection(*position_sets[1:])
+        return sorted(candidates)
+
+    @staticmethod
+    def __get_year_positions(years, positions, year_range):
+        """Returns the positions with years in a range, using the sorted years of an index
+        :type years: array
+        :type positions: array
+        :type year_range: tuple
+        :rtype: set of int
+        """
+        from_year, to_year = year_range
+        if from_year > to_year:
+            return set()
+        return set(positions[bisect_left(years, from_year):bisect_right(years, to_year)])
+
+
+def _normalise_name(name):
+    """Returns a name with runs of spaces collapsed and case folded, for lookups ignoring both
+    :type name: str
+    :rtype: str
+    """
+    return ' '.join(name.split()).casefold()
+
+
+@lru_cache(maxsize=CRITERIA_CACHE_SIZE)
+def _compile(criteria):
+    """Compiles a criteria string, see `Criteria.compile()`
+    :type criteria: str
+    :rtype: Criteria
+    """
+    return Criteria(criteria)
@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+
+# Python GEDCOM Parser
+#
+# Copyright (C) 2018 Damon Brodie (damon.brodie at gmail.com)
+# Copyright (C) 2018-2019 Nicklas Reincke (contact at reynke.com)
+# Copyright (C) 2016 Andreas Oberritter
+# Copyright (C) 2012 Madeleine Price Ball
+# Copyright (C) 2005 Daniel Zappala (zappala at cs.byu.edu)
+# Copyright (C) 2005 Brigham Young University
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Further information about the license: http://www.gnu.org/licenses/gpl-2.0.html
+
+
+import re
+from functools import lru_cache
+
+# Calendar escapes of GEDCOM dates, dates without one are Gregorian
+CALENDAR_GREGORIAN = "@#DGREGORIAN@"
+CALENDAR_JULIAN = "@#DJULIAN@"
+CALENDAR_HEBREW = "@#DHEBREW@"
+CALENDAR_FRENCH = "@#DFRENCH R@"
+CALENDAR_ROMAN = "@#DROMAN@"
+CALENDAR_UNKNOWN = "@#DUNKNOWN@"
+
+# Qualifiers of a date value, the empty qualifier marks a plain date
+QUALIFIER_ABOUT = "ABT"
+QUALIFIER_CALCULATED = "CAL"
+QUALIFIER_ESTIMATED = "EST"
+QUALIFIER_BEFORE = "BEF"
+QUALIFIER_AFTER = "AFT"
+QUALIFIER_BETWEEN = "BET"
+QUALIFIER_FROM = "FROM"
+QUALIFIER_TO = "TO"
+QUALIFIER_INTERPRETED = "INT"
+
+# Number of distinct date strings `parse_date()` remembers
+DATE_CACHE_SIZE = 65536
+
+_MONTHS = {
+    CALENDAR_GREGORIAN: ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"),
+    CALENDAR_HEBREW: ("TSH", "CSH", "KSL", "TVT", "SHV", "ADR", "ADS", "NSN", "IYR", "SVN", "TMZ", "AAV", "ELL"),
+    CALENDAR_FRENCH: ("VEND", "BRUM", "FRIM", "NIVO", "PLUV", "VENT", "GERM", "FLOR", "PRAI", "MESS", "THER",
+                      "FRUC", "COMP"),
+}
+_MONTHS[CALENDAR_JULIAN] = _MONTHS[CALENDAR_GREGORIAN]
+
+# Spellings found in files written by hand or by other programs
+_MONTH_ALIASES = {
+    "JANUARY": "JAN", "FEBRUARY": "FEB", "MARCH": "MAR", "APRIL": "APR", "JUNE": "JUN", "JULY": "JUL",
+    "AUGUST": "AUG", "SEPT": "SEP", "SEPTEMBER": "SEP", "OCTOBER": "OCT", "NOVEMBER": "NOV", "DECEMBER": "DEC",
+}
+_QUALIFIER_ALIASES = {
+    "ABOUT": QUALIFIER_ABOUT, "CIRCA": QUALIFIER_ABOUT, "CA": QUALIFIER_ABOUT, "C": QUALIFIER_ABOUT,
+    "CALCULATED": QUALIFIER_CALCULATED, "ESTIMATED": QUALIFIER_ESTIMATED,
+    "BEFORE": QUALIFIER_BEFORE, "AFTER": QUALIFIER_AFTER, "BETWEEN": QUALIFIER_BETWEEN,
+}
+
+# Offsets from the years of the Hebrew and French Republican calendars to Gregorian years
+_HEBREW_YEAR_OFFSET = -3761
+_FRENCH_YEAR_OFFSET = 1791
+
+_TOKEN_REGEX = re.compile(r'@#D[^@]*@|[^\s,]+')
+_YEAR_REGEX = re.compile(r'^(\d{1,4})(?:/(\d{2}))?$')
+
+
+class GedcomDate(object):
+    """A single date of a GEDCOM date value, such as `@#DJULIAN@ 11 FEB 1699/00`
+
+    Day and month are 0 when they are not given. Months are numbered from 1 in the order of
+    their calendar. The dual year of a Julian or Gregorian date is the year by the new style
+    of numbering years, 1700 in the example above.
+    """
+
+    __slots__ = ('__calendar', '__day', '__month', '__year', '__dual_year', '__bc')
+
+    def __init__(self, calendar, day, month, year, dual_year=None, bc=False):
+        """:type calendar: str
+        :type day: int
+        :type month: int
+        :type year: int
+        :type dual_year: int
+        :type bc: bool
+        """
+        self.__calendar = calendar
+        self.__day = day
+        self.__month = month
+        self.__year = year
+        self.__dual_year = dual_year
+        self.__bc = bc
+
+    def get_calendar(self):
+        """:rtype: str"""
+        return self.__calendar
+
+    def get_day(self):
+        """:rtype: int"""
+        return self.__day
+
+    def get_month(self):
+        """:rtype: int"""
+        return self.__month
+
+    def get_year(self):
+        """Returns the year as written, negative for years before Christ
+        :rtype: int
+        """
+        return -self.__year if self.__bc else self.__year
+
+    def get_dual_year(self):
+        """:rtype: int"""
+        return self.__dual_year
+
+    def get_interval(self):
+        """Returns the first and last day this date may refer to as `(year, month, day)` tuples
+
+        Years are converted to Gregorian years; Hebrew and French Republican dates span the two
+        Gregorian years their year overlaps. Dates of unknown calendars return `(None, None)`.
+
+        :rtype: tuple
+        """
+        calendar = self.__calendar
+        year = self.__year if self.__dual_year is None else self.__dual_year
+        if self.__bc:
+            year = 1 - year
+
+        if calendar in (CALENDAR_GREGORIAN, CALENDAR_JULIAN):
+            if self.__month == 0:
+                return (year, 1, 1), (year, 12, 31)
+            if self.__day == 0:
+                return (year, self.__month, 1), (year, self.__month, 31)
+            return (year, self.__month, self.__day), (year, self.__month, self.__day)
+        if calendar == CALENDAR_HEBREW:
+            return (year + _HEBREW_YEAR_OFFSET, 1, 1), (year + _HEBREW_YEAR_OFFSET + 1, 12, 31)
+        if calendar == CALENDAR_FRENCH:
+            return (year + _FRENCH_YEAR_OFFSET, 1, 1), (year + _FRENCH_YEAR_OFFSET + 1, 12, 31)
+        return None, None
+
+    def get_standardised(self):
+        """Returns this date written the way the GEDCOM standard writes it
+        :rtype: str
+        """
+        words = []
+        if self.__calendar != CALENDAR_GREGORIAN:
+            words.append(self.__calendar)
+        if self.__day:
+            words.append(str(self.__day))
+        if self.__month:
+            words.append(_MONTHS[self.__calendar][self.__month - 1])
+        if self.__dual_year is None:
+            words.append(str(self.__year))
+        else:
+            words.append('%d/%02d' % (self.__year, self.__dual_year % 100))
+        if self.__bc:
+            words.append("BC")
+        return ' '.join(words)
+
+
+class DateValue(object):
+    """A parsed GEDCOM date value: a date, an approximate date, a range, a period or a phrase
+
+    Date values are immutable and shared between all values parsed from the same text, see
+    `parse_date()`. Values that do not follow the GEDCOM grammar are kept as phrases without
+    dates.
+    """
+
+    __slots__ = ('__qualifier', '__first', '__second', '__phrase')
+
+    def __init__(self, qualifier="", first=None, second=None, phrase=""):
+        """:type qualifier: str
+        :type first: GedcomDate
+        :type second: GedcomDate
+        :type phrase: str
+        """
+        self.__qualifier = qualifier
+        self.__first = first
+        self.__second = second
+        self.__phrase = phrase
+
+    def get_qualifier(self):
+        """Returns one of the `QUALIFIER_` constants, or an empty string for plain dates and phrases
+        :rtype: str
+        """
+        return self.__qualifier
+
+    def get_first_date(self):
+        """:rtype: GedcomDate"""
+        return self.__first
+
+    def get_second_date(self):
+        """Returns the date after `AND` or `TO`, or `None`
+        :rtype: GedcomDate
+        """
+        return self.__second
+
+    def get_phrase(self):
+        """Returns the phrase of an `INT` value, or the normalised text of a value without dates
+        :rtype: str
+        """
+        return self.__phrase
+
+    def is_known(self):
+        """Checks if this value holds at least one date
+        :rtype: bool
+        """
+        return self.__first is not None
+
+    def is_approximate(self):
+        """:rtype: bool"""
+        return self.__qualifier in (QUALIFIER_ABOUT, QUALIFIER_CALCULATED, QUALIFIER_ESTIMATED)
+
+    def get_year(self):
+        """Returns the year of the last date of this value, or -1 if there is none
+        :rtype: int
+        """
+        date = self.__second or self.__first
+        if date is None:
+            return -1
+        return date.get_year()
+
+    def get_interval(self):
+        """Returns the first and last day this value may refer to as `(year, month, day)` tuples
+
+        Open ends, such as the start of `BEF 1900`, are `None`. Values without dates return
+        `(None, None)`.
+
+        :rtype: tuple
+        """
+        if self.__first is None:
+            return None, None
+
+        start, end = self.__first.get_interval()
+        if self.__second is not None:
+            end = self.__second.get_interval()[1]
+        elif self.__qualifier in (QUALIFIER_BEFORE, QUALIFIER_TO):
+            start = None
+        elif self.__qualifier in (QUALIFIER_AFTER, QUALIFIER_FROM):
+            end = None
+        return start, end
+
+    def overlaps(self, other):
+        """Checks if this value and another one may refer to the same day
+
+        Values without dates overlap nothing.
+
+        :type other: DateValue
+        :rtype: bool
+        """
+        if not self.is_known() or not other.is_known():
+            return False
+        start, end = self.get_interval()
+        other_start, other_end = other.get_interval()
+        if start is not None and other_end is not None and other_end < start:
+            return False
+        if other_start is not None and end is not None and end < other_start:
+            return False
+        return True
+
+    def get_sort_key(self):
+        """Returns a key ordering values by their interval, values without dates last
+        :rtype: tuple
+        """
+        start, end = self.get_interval()
+        if start is None and end is None:
+            return 2, (), ()
+        return 0 if start is None else 1, start or (), end or ()
+
+    def get_standardised(self):
+        """Returns this value written the way the GEDCOM standard writes it
+
+        Values without dates are upper-cased, with full month names abbreviated and periods
+        removed.
+
+        :rtype: str
+        """
+        if self.__first is None:
+            return self.__phrase
+
+        words = []
+        if self.__qualifier:
+            words.append(self.__qualifier)
+        words.append(self.__first.get_standardised())
+        if self.__second is not None:
+            words.append("AND" if self.__qualifier == QUALIFIER_BETWEEN else "TO")
+            words.append(self.__second.get_standardised())
+        if self.__qualifier == QUALIFIER_INTERPRETED and self.__phrase:
+            words.append('(%s)' % self.__phrase)
+        return ' '.join(words)
+
+    def __eq__(self, other):
+        return isinstance(other, DateValue) and self.get_standardised() == other.get_standardised()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.get_standardised())
+
+    def __repr__(self):
+        return 'DateValue(%r)' % self.get_standardised()
+
+
+def _normalise(text):
+    """Upper-cases a date, removes periods and abbreviates full month names
+    :type text: str
+    :rtype: str
+    """
+    words = text.upper().replace('.', '').split()
+    return ' '.join(_MONTH_ALIASES.get(word, word) for word in words)
+
+
+def _parse_date_tokens(tokens):
+    """Parses the words of a single date, returns `None` if they are not a valid date
+    :type tokens: list of str
+    :rtype: GedcomDate
+    """
+    calendar = CALENDAR_GREGORIAN
+    if tokens and tokens[0].startswith('@#D'):
+        calendar = tokens.pop(0)
+        if calendar not in _MONTHS and calendar not in (CALENDAR_ROMAN, CALENDAR_UNKNOWN):
+            return None
+
+    bc = False
+    if tokens and tokens[-1] in ('BC', 'BCE'):
+        bc = True
+        tokens = tokens[:-1]
+
+    if not 1 <= len(tokens) <= 3:
+        return None
+    match = _YEAR_REGEX.match(tokens[-1])
+    if match is None:
+        return None
+    year = int(match.group(1))
+    dual_year = None
+    if match.group(2) is not None:
+        dual_year = year + 1
+        if dual_year % 100 != int(match.group(2)):
+            return None
+
+    month = 0
+    day = 0
+    if len(tokens) > 1:
+        months = _MONTHS.get(calendar, ())
+        month_name = _MONTH_ALIASES.get(tokens[-2], tokens[-2]) if calendar in (
+            CALENDAR_GREGORIAN, CALENDAR_JULIAN) else tokens[-2]
+        if month_name not in months:
+            return None
+        month = months.index(month_name) + 1
+        if len(tokens) > 2:
+            if not tokens[0].isdecimal() or not 1 <= int(tokens[0]) <= 31:
+                return None
+            day = int(tokens[0])
+
+    return GedcomDate(calendar, day, month, year, dual_year, bc)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(text):
+    """Parses a GEDCOM date value, such as the value of a `DATE` line
+
+    Qualifiers, ranges and periods, dual years and calendar escapes of GEDCOM 5.5 are
+    understood, as well as full month names, periods after abbreviations and spellings such
+    as `ABOUT` or `CIRCA`. Text that is not a valid date value is returned as a phrase.
+    Results are cached, so the same text always returns the same object.
+
+    :type text: str
+    :rtype: DateValue
+    """
+    phrase = ''
+    body = text
+    open_bracket = text.find('(')
+    if open_bracket != -1 and text.rstrip().endswith(')'):
+        phrase = text[open_bracket + 1:text.rstrip().rfind(')')].strip()
+        body = text[:open_bracket]
+
+    tokens = _TOKEN_REGEX.findall(body.upper().replace('.', ''))
+    if not tokens:
+        return DateValue(phrase=_normalise(text))
+
+    qualifier = _QUALIFIER_ALIASES.get(tokens[0], tokens[0])
+    first = second = None
+    if qualifier in (QUALIFIER_BETWEEN, QUALIFIER_FROM) and len(tokens) > 1:
+        separator = 'AND' if qualifier == QUALIFIER_BETWEEN else QUALIFIER_TO
+        if separator in tokens:
+            position = tokens.index(separator)
+            first = _parse_date_tokens(tokens[1:position])
+            second = _parse_date_tokens(tokens[position + 1:])
+            if second is None:
+                first = None
+        elif qualifier == QUALIFIER_FROM:
+            first = _parse_date_tokens(tokens[1:])
+    elif qualifier in (QUALIFIER_ABOUT, QUALIFIER_CALCULATED, QUALIFIER_ESTIMATED, QUALIFIER_BEFORE,
+                       QUALIFIER_AFTER, QUALIFIER_TO, QUALIFIER_INTERPRETED):
+        first = _parse_date_tokens(tokens[1:])
+    else:
+        qualifier = ''
+        first = _parse_date_tokens(tokens)
+
+    if first is None:
+        return DateValue(phrase=_normalise(text))
+    if phrase and qualifier != QUALIFIER_INTERPRETED:
+        return DateValue(phrase=_normalise(text))
+    return DateValue(qualifier, first, second, phrase)
@@ -25,10 +25,15 @@
 #
 # Further information about the license: http://www.gnu.org/licenses/gpl-2.0.html
 
-from sys import version_info
 from gedcom.helpers import deprecated
 import gedcom.tags
 
+# Shared by all elements without children, in place of an empty list each
+_NO_CHILDREN = ()
+
+# Elements with fewer children are searched instead of indexed by tag
+_TAG_INDEX_MIN_CHILDREN = 8
+
 
 class Element(object):
     """GEDCOM element
@@ -54,8 +59,15 @@ class Element(object):
     child.
 
     See a GEDCOM file for examples of tags and their values.
+
+    Elements use `__slots__` to keep large trees small. Elements without children share
+    one empty tuple instead of holding an empty list each until the first child is added;
+    `get_child_elements()` still returns a list for them.
+    Elements with many children index them by tag when first searched by tag.
     """
 
+    __slots__ = ('__level', '__pointer', '__tag', '__value', '__crlf', '__children', '__parent', '__tag_index')
+
     def __init__(self, level, pointer, tag, value, crlf="\n", multi_line=True):
         """Initialize an element
 
@@ -65,7 +77,7 @@ class Element(object):
         :type level: int
         :type pointer: str
         :type tag: str
-        :type value: str
+        :type value: str or bytes
         :type crlf: str
         :type multi_line: bool
         """
@@ -78,8 +90,9 @@ class Element(object):
         self.__crlf = crlf
 
         # structuring
-        self.__children = []
+        self.__children = _NO_CHILDREN
         self.__parent = None
+        self.__tag_index = None
 
         if multi_line:
             self.set_multi_line_value(value)
@@ -106,28 +119,44 @@ class Element(object):
         """Return the value of this element from within the GEDCOM file
         :rtype: str
         """
+        # Values read by the memory-mapped parser are kept as undecoded bytes until they are first needed
+        if isinstance(self.__value, bytes):
+            self.__value = self.__value.decode('utf-8')
         return self.__value
 
+    def _get_undecoded_value(self):
+        """Returns the value of this element without decoding it, as `bytes` if it was never accessed
+        :rtype: str or bytes
+        """
+        return self.__value
+
+    def get_crlf(self):
+        """Returns the line ending of this element from within the GEDCOM file
+        :rtype: str
+        """
+        return self.__crlf
+
     def set_value(self, value):
         """Sets the value of this element
         :type value: str
         """
         self.__value = value
+        self._subtree_changed(self)
 
     def get_multi_line_value(self):
         """Returns the value of this element including concatenations or continuations
         :rtype: str
         """
         result = self.get_value()
-        last_crlf = self.__crlf
+        last_crlf = self.get_crlf()
         for element in self.get_child_elements():
             tag = element.get_tag()
             if tag == gedcom.tags.GEDCOM_TAG_CONCATENATION:
                 result += element.get_value()
-                last_crlf = element.__crlf
+                last_crlf = element.get_crlf()
             elif tag == gedcom.tags.GEDCOM_TAG_CONTINUED:
                 result += last_crlf + element.get_value()
-                last_crlf = element.__crlf
+                last_crlf = element.get_crlf()
         return result
 
     def __available_characters(self):
@@ -185,8 +214,9 @@ class Element(object):
         :type value: str
         """
         self.set_value('')
-        self.get_child_elements()[:] = [child for child in self.get_child_elements() if
-                                        child.get_tag() not in (gedcom.tags.GEDCOM_TAG_CONCATENATION, gedcom.tags.GEDCOM_TAG_CONTINUED)]
+        for child in [child for child in self.get_child_elements() if
+                      child.get_tag() in (gedcom.tags.GEDCOM_TAG_CONCATENATION, gedcom.tags.GEDCOM_TAG_CONTINUED)]:
+            self.remove_child_element(child)
 
         lines = value.splitlines()
         if lines:
@@ -200,10 +230,47 @@ class Element(object):
 
     def get_child_elements(self):
         """Returns the direct child elements of this element
+
+        Use `add_child_element()` to add children: elements without children return a new
+        empty list each time, so changing that list does not change the element.
+
         :rtype: list of Element
         """
+        if self.__children is _NO_CHILDREN:
+            return []
         return self.__children
 
+    def get_child_elements_by_tag(self, tag):
+        """Returns the direct child elements of this element with the given tag, in order
+
+        For elements with many children the children are indexed by tag on the first call;
+        the index is dropped when children are added or removed. Call `invalidate_tag_index()`
+        after changing the list returned by `get_child_elements()` directly. A new list is
+        returned on every call, so changing it does not affect the index.
+
+        :type tag: str
+        :rtype: list of Element
+        """
+        children = self.__children
+        if len(children) < _TAG_INDEX_MIN_CHILDREN:
+            return [child for child in children if child.get_tag() == tag]
+
+        tag_index = self.__tag_index
+        if tag_index is None:
+            tag_index = self.__tag_index = {}
+            for child in children:
+                child_tag = child.get_tag()
+                if child_tag in tag_index:
+                    tag_index[child_tag].append(child)
+                else:
+                    tag_index[child_tag] = [child]
+
+        return list(tag_index.get(tag, _NO_CHILDREN))
+
+    def invalidate_tag_index(self):
+        """Drops the index of the child elements by tag, see `get_child_elements_by_tag()`"""
+        self.__tag_index = None
+
     def new_child_element(self, tag, pointer="", value=""):
         """Creates and returns a new child element of this element
 
@@ -238,11 +305,58 @@ class Element(object):
 
         :type element: Element
         """
-        self.get_child_elements().append(element)
-        element.set_parent_element(self)
+        self._append_child_element(element)
+        self._element_added(element)
 
         return element
 
+    def remove_child_element(self, element):
+        """Removes a child element, together with its sub-elements, from this element
+
+        :type element: Element
+        """
+        if self.__children is _NO_CHILDREN:
+            raise ValueError("The element is not a child of this element")
+        self.__children.remove(element)
+        self.__tag_index = None
+        element.set_parent_element(None)
+        self._element_removed(element)
+
+    def _append_child_element(self, element):
+        """Adds a child element without notifying the ancestors of this element
+
+        Used by the parser while it builds a tree, see `add_child_element()`.
+
+        :type element: Element
+        """
+        if self.__children is _NO_CHILDREN:
+            self.__children = [element]
+        else:
+            self.__children.append(element)
+        self.__tag_index = None
+        element.set_parent_element(self)
+
+    def _element_added(self, element):
+        """Called on the parent and all ancestors of an element after it has been added
+        :type element: Element
+        """
+        if self.__parent is not None:
+            self.__parent._element_added(element)
+
+    def _element_removed(self, element):
+        """Called on the former parent and all of its ancestors after an element has been removed
+        :type element: Element
+        """
+        if self.__parent is not None:
+            self.__parent._element_removed(element)
+
+    def _subtree_changed(self, element):
+        """Called on an element and all of its ancestors after its value has been changed
+        :type element: Element
+        """
+        if self.__parent is not None:
+            self.__parent._subtree_changed(element)
+
     def get_parent_element(self):
         """Returns the parent element of this element
         :rtype: Element
@@ -285,7 +399,7 @@ class Element(object):
         if self.get_value() != "":
             result += ' ' + self.get_value()
 
-        result += self.__crlf
+        result += self.get_crlf()
 
         if recursive:
             for child_element in self.get_child_elements():
@@ -295,7 +409,4 @@ class Element(object):
 
     def __str__(self):
         """:rtype: str"""
-        if version_info[0] >= 3:
-            return self.to_gedcom_string()
-
-        return self.to_gedcom_string().encode('utf-8-sig')
+        return self.to_gedcom_string()
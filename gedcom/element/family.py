@@ -35,6 +35,8 @@ class NotAnActualFamilyError(Exception):
 
 class FamilyElement(Element):
 
+    __slots__ = ()
+
     def is_family(self):
         """Checks if this element is an actual family
         :rtype: bool
@@ -35,6 +35,8 @@ class NotAnActualFileError(Exception):
 
 class FileElement(Element):
 
+    __slots__ = ()
+
     def is_file(self):
         """Checks if this element is an actual file
         :rtype: bool
@@ -30,6 +30,9 @@
 # 2022-12-21 - Adding birthdate match...
 
 import re as regex
+from collections import namedtuple
+from gedcom.criteria import Criteria
+from gedcom.date import parse_date
 from gedcom.element.element import Element
 from gedcom.helpers import deprecated
 import gedcom.tags
@@ -39,7 +42,68 @@ class NotAnActualIndividualError(Exception):
     pass
 
 
+# The facts about an individual used for searching and comparing, see `IndividualElement.get_facts()`
+IndividualFacts = namedtuple('IndividualFacts', [
+    'given_name', 'surname', 'gender',
+    'birth_date', 'birth_year', 'birth_place',
+    'death_date', 'death_year', 'death_place',
+    'deceased', 'private', 'family_child_pointers', 'family_spouse_pointers',
+])
+
+
+def _get_year(date):
+    """Returns the year of a date as written in a GEDCOM file, or -1
+
+    For values that are not valid GEDCOM dates the last word is taken if it is a number.
+
+    :type date: str
+    :rtype: int
+    """
+    date_value = parse_date(date)
+    if date_value.is_known():
+        return date_value.get_year()
+
+    date_split = date.split()
+    if not date_split:
+        return -1
+    try:
+        return int(date_split[len(date_split) - 1])
+    except ValueError:
+        return -1
+
+
+def _get_event_data(event, date, place, sources):
+    """Reads the date, place and sources of an event such as a birth into the given values
+
+    Later dates and places replace earlier ones, sources are appended to `sources`.
+
+    :type event: Element
+    :type date: str
+    :type place: str
+    :type sources: list of str
+    :rtype: tuple
+    """
+    for child in event.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_DATE):
+        date = child.get_value()
+    for child in event.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_PLACE):
+        place = child.get_value()
+    for child in event.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_SOURCE):
+        sources.append(child.get_value())
+    return date, place, sources
+
+
 class IndividualElement(Element):
+    """GEDCOM individual record
+
+    The facts returned by `get_facts()`, and the getters built on them, are extracted once and
+    cached until the individual or one of its sub-elements is changed.
+    """
+
+    __slots__ = ('__facts',)
+
+    def __init__(self, level, pointer, tag, value, crlf="\n", multi_line=True):
+        self.__facts = None
+        super(IndividualElement, self).__init__(level, pointer, tag, value, crlf, multi_line)
 
     ###MOT 2023.08.10 - added attempt to check for exact match
     def is_identical(self,a):
@@ -58,11 +122,7 @@ class IndividualElement(Element):
         if not self.is_individual():
             return False
 
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_DEATH:
-                return True
-
-        return False
+        return self.get_facts().deceased
 
     def is_child(self):
         """Checks if this element is a child of a family
@@ -73,13 +133,7 @@ class IndividualElement(Element):
                 "Operation only valid for elements with %s tag" % gedcom.tags.GEDCOM_TAG_INDIVIDUAL
             )
 
-        found_child = False
-
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_FAMILY_CHILD:
-                found_child = True
-
-        return found_child
+        return len(self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_FAMILY_CHILD)) > 0
 
     def is_private(self):
         """Checks if this individual is marked private
@@ -88,59 +142,122 @@ class IndividualElement(Element):
         if not self.is_individual():
             return False
 
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_PRIVATE:
-                private = child.get_value()
-                if private == 'Y':
-                    return True
+        return self.get_facts().private
 
-        return False
+    def get_facts(self):
+        """Returns the facts about this individual, extracted once and cached
 
-    def get_name(self):
-        """Returns an individual's names as a tuple: (`str` given_name, `str` surname)
+        The cache is dropped when a sub-element is added, removed or given a new value through
+        the element methods. Call `invalidate_facts()` after changing the list returned by
+        `get_child_elements()` directly.
+
+        :rtype: IndividualFacts
+        """
+        facts = self.__facts
+        if facts is None:
+            facts = self.__facts = self.__extract_facts()
+        return facts
+
+    def invalidate_facts(self):
+        """Drops the cached facts about this individual, see `get_facts()`"""
+        self.__facts = None
+
+    def _element_added(self, element):
+        self.__facts = None
+        super(IndividualElement, self)._element_added(element)
+
+    def _element_removed(self, element):
+        self.__facts = None
+        super(IndividualElement, self)._element_removed(element)
+
+    def _subtree_changed(self, element):
+        self.__facts = None
+        super(IndividualElement, self)._subtree_changed(element)
+
+    def __extract_facts(self):
+        """Reads the facts about this individual from its sub-elements
+        :rtype: IndividualFacts
+        """
+        given_name, surname = self.__extract_name()
+
+        gender = ""
+        for child in self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_SEX):
+            gender = child.get_value()
+
+        birth_date = ""
+        birth_place = ""
+        for child in self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_BIRTH):
+            birth_date, birth_place, _ = _get_event_data(child, birth_date, birth_place, [])
+
+        death_date = ""
+        death_place = ""
+        deaths = self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_DEATH)
+        for child in deaths:
+            death_date, death_place, _ = _get_event_data(child, death_date, death_place, [])
+
+        private = False
+        for child in self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_PRIVATE):
+            if child.get_value() == 'Y':
+                private = True
+
+        return IndividualFacts(
+            given_name, surname, gender,
+            str(birth_date), _get_year(birth_date), birth_place,
+            str(death_date), _get_year(death_date), death_place,
+            len(deaths) > 0, private,
+            tuple(child.get_value() for child in self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_FAMILY_CHILD)),
+            tuple(child.get_value() for child in self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_FAMILY_SPOUSE)),
+        )
+
+    def __extract_name(self):
+        """Reads the names of this individual as a tuple: (`str` given_name, `str` surname)
         :rtype: tuple
         """
         given_name = ""
         surname = ""
 
-        if not self.is_individual():
-            return given_name, surname
-
         # Return the first gedcom.tags.GEDCOM_TAG_NAME that is found.
         # Alternatively as soon as we have both the gedcom.tags.GEDCOM_TAG_GIVEN_NAME and _SURNAME return those.
         found_given_name = False
         found_surname_name = False
 
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_NAME:
-                # Some GEDCOM files don't use child tags but instead
-                # place the name in the value of the NAME tag.
-                if child.get_value() != "":
-                    name = child.get_value().split('/')
+        for child in self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_NAME):
+            # Some GEDCOM files don't use child tags but instead
+            # place the name in the value of the NAME tag.
+            if child.get_value() != "":
+                name = child.get_value().split('/')
 
-                    if len(name) > 0:
-                        given_name = name[0].strip()
-                        if len(name) > 1:
-                            surname = name[1].strip()
+                if len(name) > 0:
+                    given_name = name[0].strip()
+                    if len(name) > 1:
+                        surname = name[1].strip()
 
-                    return given_name, surname
+                return given_name, surname
 
-                for childOfChild in child.get_child_elements():
+            for childOfChild in child.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_GIVEN_NAME):
+                given_name = childOfChild.get_value()
+                found_given_name = True
 
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_GIVEN_NAME:
-                        given_name = childOfChild.get_value()
-                        found_given_name = True
+            for childOfChild in child.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_SURNAME):
+                surname = childOfChild.get_value()
+                found_surname_name = True
 
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_SURNAME:
-                        surname = childOfChild.get_value()
-                        found_surname_name = True
-
-                if found_given_name and found_surname_name:
-                    return given_name, surname
+            if found_given_name and found_surname_name:
+                return given_name, surname
 
         # If we reach here we are probably returning empty strings
         return given_name, surname
 
+    def get_name(self):
+        """Returns an individual's names as a tuple: (`str` given_name, `str` surname)
+        :rtype: tuple
+        """
+        if not self.is_individual():
+            return "", ""
+
+        facts = self.get_facts()
+        return facts.given_name, facts.surname
+
     #MOT: added 2022.12.19 gender match
     def gender_match(self, gender_to_match):
         """Matches a string with the gender of an individual
@@ -178,16 +295,10 @@ class IndividualElement(Element):
         """Returns the gender of a person in string format
         :rtype: str
         """
-        gender = ""
-
         if not self.is_individual():
-            return gender
-
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_SEX:
-                gender = child.get_value()
+            return ""
 
-        return gender
+        return self.get_facts().gender
 
     def get_birth_data(self):
         """Returns the birth data of a person formatted as a tuple: (`str` date, `str` place, `list` sources)
@@ -200,18 +311,8 @@ class IndividualElement(Element):
         if not self.is_individual():
             return date, place, sources
 
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_BIRTH:
-                for childOfChild in child.get_child_elements():
-
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_DATE:
-                        date = childOfChild.get_value()
-
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_PLACE:
-                        place = childOfChild.get_value()
-
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_SOURCE:
-                        sources.append(childOfChild.get_value())
+        for child in self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_BIRTH):
+            date, place, sources = _get_event_data(child, date, place, sources)
 
         return date, place, sources
 
@@ -219,67 +320,31 @@ class IndividualElement(Element):
         """Returns the birth year of a person in integer format
         :rtype: int
         """
-        date = ""
-
         if not self.is_individual():
-            return date
-
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_BIRTH:
-                for childOfChild in child.get_child_elements():
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_DATE:
-                        date_split = childOfChild.get_value().split()
-                        date = date_split[len(date_split) - 1]
+            return ""
 
-        if date == "":
-            return -1
-        try:
-            return int(date)
-        except ValueError:
-            return -1
+        return self.get_facts().birth_year
 
     #MOT: 2022.12.21 added get_birth date
     def get_birth_date(self):
         """Returns the birth date of a person in string format
         :rtype: str
         """
-        date = ""
-
         if not self.is_individual():
-            return date
-
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_BIRTH:
-                for childOfChild in child.get_child_elements():
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_DATE:
-                        date = str(childOfChild.get_value())
-
-        try:
-            return str(date)
-        except ValueError:
             return ""
 
+        return self.get_facts().birth_date
+
 	#MOT: 2023.08.09 added get_death_date
     def get_death_date(self):
         """Returns the death date of a person in string format
         :rtype: str
         """
-        date = ""
-
         if not self.is_individual():
-            return date
-
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_DEATH:
-                for childOfChild in child.get_child_elements():
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_DATE:
-                        date = str(childOfChild.get_value())
-
-        try:
-            return str(date)
-        except ValueError:
             return ""
 
+        return self.get_facts().death_date
+
     def get_death_data(self):
         """Returns the death data of a person formatted as a tuple: (`str` date, `str` place, `list` sources)
         :rtype: tuple
@@ -291,15 +356,8 @@ class IndividualElement(Element):
         if not self.is_individual():
             return date, place
 
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_DEATH:
-                for childOfChild in child.get_child_elements():
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_DATE:
-                        date = childOfChild.get_value()
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_PLACE:
-                        place = childOfChild.get_value()
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_SOURCE:
-                        sources.append(childOfChild.get_value())
+        for child in self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_DEATH):
+            date, place, sources = _get_event_data(child, date, place, sources)
 
         return date, place, sources
 
@@ -307,24 +365,10 @@ class IndividualElement(Element):
         """Returns the death year of a person in integer format
         :rtype: int
         """
-        date = ""
-
         if not self.is_individual():
-            return date
-
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_DEATH:
-                for childOfChild in child.get_child_elements():
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_DATE:
-                        date_split = childOfChild.get_value().split()
-                        date = date_split[len(date_split) - 1]
+            return ""
 
-        if date == "":
-            return -1
-        try:
-            return int(date)
-        except ValueError:
-            return -1
+        return self.get_facts().death_year
 
     @deprecated
     def get_burial(self):
@@ -345,18 +389,8 @@ class IndividualElement(Element):
         if not self.is_individual():
             return date, place
 
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_BURIAL:
-                for childOfChild in child.get_child_elements():
-
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_DATE:
-                        date = childOfChild.get_value()
-
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_PLACE:
-                        place = childOfChild.get_value()
-
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_SOURCE:
-                        sources.append(childOfChild.get_value())
+        for child in self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_BURIAL):
+            date, place, sources = _get_event_data(child, date, place, sources)
 
         return date, place, sources
 
@@ -379,25 +413,8 @@ class IndividualElement(Element):
                 "Operation only valid for elements with %s tag" % gedcom.tags.GEDCOM_TAG_INDIVIDUAL
             )
 
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_CENSUS:
-
-                date = ''
-                place = ''
-                sources = []
-
-                for childOfChild in child.get_child_elements():
-
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_DATE:
-                        date = childOfChild.get_value()
-
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_PLACE:
-                        place = childOfChild.get_value()
-
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_SOURCE:
-                        sources.append(childOfChild.get_value())
-
-                census.append((date, place, sources))
+        for child in self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_CENSUS):
+            census.append(_get_event_data(child, '', '', []))
 
         return census
 
@@ -410,11 +427,9 @@ class IndividualElement(Element):
         if not self.is_individual():
             return date
 
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_CHANGE:
-                for childOfChild in child.get_child_elements():
-                    if childOfChild.get_tag() == gedcom.tags.GEDCOM_TAG_DATE:
-                        date = childOfChild.get_value()
+        for child in self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_CHANGE):
+            for childOfChild in child.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_DATE):
+                date = childOfChild.get_value()
 
         return date
 
@@ -427,9 +442,8 @@ class IndividualElement(Element):
         if not self.is_individual():
             return occupation
 
-        for child in self.get_child_elements():
-            if child.get_tag() == gedcom.tags.GEDCOM_TAG_OCCUPATION:
-                occupation = child.get_value()
+        for child in self.get_child_elements_by_tag(gedcom.tags.GEDCOM_TAG_OCCUPATION):
+            occupation = child.get_value()
 
         return occupation
 
@@ -504,75 +518,9 @@ class IndividualElement(Element):
              Match a person whose birth year is in the range of years from
              [from_year] to [to_year], including both [from_year] and [to_year].
 
+        The criteria string is compiled once and cached, see `gedcom.criteria.Criteria`.
+
         :type criteria: str
         :rtype: bool
         """
-
-        # Check if criteria is a valid criteria and can be split by `:` and `=` characters
-        try:
-            for criterion in criteria.split(':'):
-                criterion.split('=')
-        except ValueError:
-            return False
-
-        match = True
-
-        for criterion in criteria.split(':'):
-            key, value = criterion.split('=')
-
-            if key == "surname" and not self.surname_match(value):
-                match = False
-            elif key == "name" and not self.given_name_match(value):
-                match = False
-            elif key == "gender" and not self.gender_match(value):
-                match = False
-            elif key == "birth":
-
-                try:
-                    year = int(value)
-                    if not self.birth_year_match(year):
-                        match = False
-                except ValueError:
-                    match = False
-
-            elif key == "birth_date":
-
-                try:
-                    #date = datetime(value)
-                    if not self.birth_date_match(value):
-                        match = False
-                except ValueError:
-                    match = False
-
-            elif key == "birth_range":
-
-                try:
-                    from_year, to_year = value.split('-')
-                    from_year = int(from_year)
-                    to_year = int(to_year)
-                    if not self.birth_range_match(from_year, to_year):
-                        match = False
-                except ValueError:
-                    match = False
-
-            elif key == "death":
-
-                try:
-                    year = int(value)
-                    if not self.death_year_match(year):
-                        match = False
-                except ValueError:
-                    match = False
-
-            elif key == "death_range":
-
-                try:
-                    from_year, to_year = value.split('-')
-                    from_year = int(from_year)
-                    to_year = int(to_year)
-                    if not self.death_range_match(from_year, to_year):
-                        match = False
-                except ValueError:
-                    match = False
-
-        return match
+        return Criteria.compile(criteria).matches(self)
@@ -35,6 +35,8 @@ class NotAnActualObjectError(Exception):
 
 class ObjectElement(Element):
 
+    __slots__ = ()
+
     def is_object(self):
         """Checks if this element is an actual object
         :rtype: bool
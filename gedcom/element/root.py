@@ -29,7 +29,33 @@ from gedcom.element.element import Element
 
 
 class RootElement(Element):
-    """Virtual GEDCOM root element containing all logical records as children"""
+    """Virtual GEDCOM root element containing all logical records as children
+
+    A listener, usually the `Parser` owning the tree, is told about every element added to or
+    removed from the tree through `add_child_element()`, `new_child_element()` and
+    `remove_child_element()`, and about every value changed through `set_value()`.
+    """
+
+    __slots__ = ('__listener',)
 
     def __init__(self, level=-1, pointer="", tag="ROOT", value="", crlf="\n", multi_line=True):
+        self.__listener = None
         super(RootElement, self).__init__(level, pointer, tag, value, crlf, multi_line)
+
+    def set_listener(self, listener):
+        """Sets the object whose `_element_added()`, `_element_removed()` and `_subtree_changed()`
+        methods are called when the tree changes, or `None`
+        """
+        self.__listener = listener
+
+    def _element_added(self, element):
+        if self.__listener is not None:
+            self.__listener._element_added(element)
+
+    def _element_removed(self, element):
+        if self.__listener is not None:
+            self.__listener._element_removed(element)
+
+    def _subtree_changed(self, element):
+        if self.__listener is not None:
+            self.__listener._subtree_changed(element)
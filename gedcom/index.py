@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+# Python GEDCOM Parser
+#
+# Copyright (C) 2018 Damon Brodie (damon.brodie at gmail.com)
+# Copyright (C) 2018-2019 Nicklas Reincke (contact at reynke.com)
+# Copyright (C) 2016 Andreas Oberritter
+# Copyright (C) 2012 Madeleine Price Ball
+# Copyright (C) 2005 Daniel Zappala (zappala at cs.byu.edu)
+# Copyright (C) 2005 Brigham Young University
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Further information about the license: http://www.gnu.org/licenses/gpl-2.0.html
+
+import codecs
+import os
+import pickle
+import tempfile
+import zlib
+from array import array
+
+# Bump when the layout of index files changes
+INDEX_VERSION = 1
+
+INDEX_FILE_EXTENSION = ".gidx"
+
+
+class StaleIndexError(Exception):
+    pass
+
+
+class RecordIndex(object):
+    """Byte offsets of the logical records of a GEDCOM file
+
+    Built by scanning a file for lines starting with `0 `, without parsing anything else.
+    For every record the index holds its pointer (empty for records such as `HEAD`), its tag,
+    the byte offset and length of all of its lines, the line number it starts on and a CRC-32
+    of its content. Records are kept in file order.
+
+    An index can be saved to a sidecar file next to the GEDCOM file (see `get_index_path()`) and
+    loaded again by later runs instead of scanning the file. A saved index is stale, and not
+    loaded, once the size or modification time of the GEDCOM file changes; the content hash
+    of a record catches changes that keep both, see `verify()`.
+    """
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self.__pointers = []
+        self.__tags = []
+        self.__offsets = array('q')
+        self.__lengths = array('q')
+        self.__line_numbers = array('q')
+        self.__hashes = array('L')
+        self.__positions = {}
+
+    def __len__(self):
+        """Returns the number of records
+        :rtype: int
+        """
+        return len(self.__pointers)
+
+    @classmethod
+    def scan(cls, buffer):
+        """Builds an index from the content of a GEDCOM file
+
+        `buffer` may be `bytes` or a memory map of the file.
+
+        :type buffer: bytes or mmap.mmap
+        :rtype: RecordIndex
+        """
+        index = cls()
+        size = len(buffer)
+        start = len(codecs.BOM_UTF8) if buffer[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+        line_number = 1
+
+        while start < size:
+            end = buffer.find(b'\n0 ', start)
+            end = size if end == -1 else end + 1
+
+            header_end = buffer.find(b'\n', start, end)
+            header = buffer[start + 2:end if header_end == -1 else header_end].rstrip(b'\r')
+            pointer = ''
+            if header[:1] == b'@':
+                pointer_end = header.find(b'@ ', 1)
+                if pointer_end > 1:
+                    pointer = header[:pointer_end + 1].decode('utf-8')
+                    header = header[pointer_end + 2:]
+            tag = header.split(b' ', 1)[0].decode('utf-8')
+
+            record = buffer[start:end]
+            index.add(pointer, tag, start, end - start, line_number, zlib.crc32(record))
+            line_number += record.count(b'\n')
+            start = end
+
+        return index
+
+    @classmethod
+    def load(cls, index_path, file_path):
+        """Loads an index saved for a GEDCOM file, or returns `None` if it is missing or stale
+
+        Unreadable index files are treated as missing. Index files that cannot be decoded, or
+        that were written by another version, are removed.
+
+        :type index_path: str
+        :type file_path: str
+        :rtype: RecordIndex
+        """
+        try:
+            with open(index_path, 'rb') as index_file:
+                data = index_file.read()
+        except EnvironmentError:
+            return None
+        stat = os.stat(file_path)
+
+        try:
+            data = pickle.loads(zlib.decompress(data))
+            if not isinstance(data, dict) or data.get('version') != INDEX_VERSION:
+                raise ValueError("Not an index of version %d" % INDEX_VERSION)
+            if data['size'] != stat.st_size or data['mtime_ns'] != stat.st_mtime_ns:
+                return None
+
+            index = cls()
+            for pointer, tag, offset, length, line_number, content_hash in zip(
+                    data['pointers'], data['tags'], data['offsets'], data['lengths'], data['line_numbers'],
+                    data['hashes']):
+                index.add(pointer, tag, offset, length, line_number, content_hash)
+            return index
+        except Exception:
+            # Truncated or corrupt data can fail in many ways while unpickling or reading the fields
+            try:
+                os.remove(index_path)
+            except EnvironmentError:
+                pass
+            return None
+
+    def save(self, index_path, file_path):
+        """Saves this index of a GEDCOM file, recording the size and modification time of the file
+        :type index_path: str
+        :type file_path: str
+        """
+        stat = os.stat(file_path)
+        data = {
+            'version': INDEX_VERSION,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'pointers': self.__pointers,
+            'tags': self.__tags,
+            'offsets': self.__offsets,
+            'lengths': self.__lengths,
+            'line_numbers': self.__line_numbers,
+            'hashes': self.__hashes,
+        }
+
+        descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(index_path)))
+        try:
+            with os.fdopen(descriptor, 'wb') as index_file:
+                index_file.write(zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL), 1))
+            os.replace(temporary_path, index_path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+    def add(self, pointer, tag, offset, length, line_number, content_hash=0):
+        """Appends a record to the index
+        :type pointer: str
+        :type tag: str
+        :type offset: int
+        :type length: int
+        :type line_number: int
+        :type content_hash: int
+        """
+        if pointer:
+            self.__positions[pointer] = len(self.__pointers)
+        self.__pointers.append(pointer)
+        self.__tags.append(tag)
+        self.__offsets.append(offset)
+        self.__lengths.append(length)
+        self.__line_numbers.append(line_number)
+        self.__hashes.append(content_hash)
+
+    def find(self, pointer):
+        """Returns the position of the record with the given pointer, or `None`
+        :type pointer: str
+        :rtype: int
+        """
+        return self.__positions.get(pointer)
+
+    def get_pointers(self):
+        """Returns the pointers of all records having one, in file order
+        :rtype: list of str
+        """
+        return [
+            pointer for position, pointer in enumerate(self.__pointers)
+            if pointer and self.__positions[pointer] == position
+        ]
+
+    def get_pointer_count(self):
+        """Returns the number of distinct record pointers
+        :rtype: int
+        """
+        return len(self.__positions)
+
+    def get_pointer(self, position):
+        """:rtype: str"""
+        return self.__pointers[position]
+
+    def get_tag(self, position):
+        """:rtype: str"""
+        return self.__tags[position]
+
+    def get_offset(self, position):
+        """:rtype: int"""
+        return self.__offsets[position]
+
+    def get_length(self, position):
+        """:rtype: int"""
+        return self.__lengths[position]
+
+    def get_line_number(self, position):
+        """:rtype: int"""
+        return self.__line_numbers[position]
+
+    def verify(self, position, record):
+        """Raises a `StaleIndexError` if the content of a record does not match the index
+        :type position: int
+        :type record: bytes
+        """
+        if zlib.crc32(record) != self.__hashes[position]:
+            raise StaleIndexError(
+                "Record at byte offset %d has changed since the record index was built" % self.__offsets[position]
+            )
+
+
+def get_index_path(file_path):
+    """Returns the path of the sidecar index file of a GEDCOM file
+    :type file_path: str
+    :rtype: str
+    """
+    return file_path + INDEX_FILE_EXTENSION
@@ -0,0 +1,589 @@
+# -*- coding: utf-8 -*-
+
+# Python GEDCOM Parser
+#
+# Copyright (C) 2018 Damon Brodie (damon.brodie at gmail.com)
+# Copyright (C) 2018-2019 Nicklas Reincke (contact at reynke.com)
+# Copyright (C) 2016 Andreas Oberritter
+# Copyright (C) 2012 Madeleine Price Ball
+# Copyright (C) 2005 Daniel Zappala (zappala at cs.byu.edu)
+# Copyright (C) 2005 Brigham Young University
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Further information about the license: http://www.gnu.org/licenses/gpl-2.0.html
+
+
+import heapq
+import time
+from collections import deque
+from gedcom.blocking import BlockingIndex, get_blocking_key
+from gedcom.date import parse_date
+
+# Lowest score of a pair that `match_individuals()` may match, passing the checks of names, gender and years
+MIN_MATCH_SCORE = 0.4
+
+# Largest number of individuals on either side of a block that is refined with the Hungarian method
+MAX_REFINED_BLOCK_SIZE = 200
+
+# Smallest number of pairs a `PairScorer` sends to its worker processes, fewer pairs are scored directly
+MIN_PARALLEL_PAIRS = 64
+
+# Most candidate pairs `find_candidate_pairs()` collects before having them scored
+_CANDIDATE_CHUNK_SIZE = 1 << 16
+
+# Facts of the individuals of both files, set once in each worker process of a `PairScorer`
+_worker_facts = None
+
+
+class ComparisonFrontier(object):
+    """Pairs of individuals still to be compared while walking two trees side by side
+
+    Each pair is added at most once: pairs that are waiting or have been compared are
+    recognised by the pointers of both individuals. By default pairs are compared last in,
+    first out, so the relatives of a pair are compared before the pairs found earlier.
+
+    With `breadth_first`, pairs are compared first in, first out, so all pairs of one
+    separation are compared before the next: `get_level()` then returns a whole level at
+    once, e.g. to score it in a `PairScorer`.
+
+    With `best_first`, the pair with the highest confidence is compared next, and of pairs
+    with the same confidence the one closest to the first pair, then the one added first.
+    Confidence is the score of `score_individuals()` unless given when adding a pair. Pairs
+    scoring less than `min_confidence` are dropped when added. The walk ends early once
+    `max_pairs` pairs have been taken or `max_seconds` have passed since the frontier was
+    created, see `is_done()`.
+    """
+
+    def __init__(self, max_separation=None, best_first=False, min_confidence=None, max_pairs=None,
+                 max_seconds=None, breadth_first=False):
+        """:type max_separation: int
+        :type best_first: bool
+        :type min_confidence: float
+        :type max_pairs: int
+        :type max_seconds: float
+        :type breadth_first: bool
+        """
+        if best_first and breadth_first:
+            raise ValueError("Pairs can be compared either best first or breadth first")
+        self.__max_separation = max_separation
+        self.__best_first = best_first
+        self.__breadth_first = breadth_first
+        self.__min_confidence = min_confidence
+        self.__max_pairs = max_pairs
+        self.__deadline = None if max_seconds is None else time.monotonic() + max_seconds
+        self.__pairs = [] if best_first else deque()
+        self.__seen = set()
+        self.__added_count = 0
+        self.__checked_count = 0
+        self.__pruned_count = 0
+
+    def __len__(self):
+        """Returns the number of pairs waiting to be compared
+        :rtype: int
+        """
+        return len(self.__pairs)
+
+    def add(self, individual_1, individual_2, separation, confidence=None):
+        """Adds a pair to be compared, returns `False` if it was already added, is too far away or too weak
+
+        `separation` is the number of steps from the first pair, pairs further away than the
+        maximum separation are not added.
+
+        :type individual_1: IndividualElement
+        :type individual_2: IndividualElement
+        :type separation: int
+        :type confidence: float
+        :rtype: bool
+        """
+        if self.__max_separation is not None and separation > self.__max_separation:
+            return False
+        key = (individual_1.get_pointer(), individual_2.get_pointer())
+        if key in self.__seen:
+            return False
+        self.__seen.add(key)
+
+        if confidence is None and (self.__best_first or self.__min_confidence is not None):
+            confidence = score_individuals(individual_1, individual_2)
+        if self.__min_confidence is not None and confidence < self.__min_confidence:
+            self.__pruned_count += 1
+            return False
+
+        if self.__best_first:
+            heapq.heappush(self.__pairs, (-confidence, separation, self.__added_count, individual_1, individual_2))
+        else:
+            self.__pairs.append((individual_1, individual_2, separation))
+        self.__added_count += 1
+        return True
+
+    def get_level(self):
+        """Returns the waiting pairs with the separation of the next pair as tuples (individual 1, individual 2)
+
+        Breadth first, these are all pairs of the level compared next, in the order they will
+        be compared. Otherwise only the next pair is returned.
+
+        :rtype: list of tuple
+        """
+        if not self.__pairs:
+            return []
+        if self.__best_first:
+            return [(self.__pairs[0][3], self.__pairs[0][4])]
+        if not self.__breadth_first:
+            return [self.__pairs[-1][:2]]
+
+        separation = self.__pairs[0][2]
+        level = []
+        for individual_1, individual_2, pair_separation in self.__pairs:
+            if pair_separation != separation:
+                break
+            level.append((individual_1, individual_2))
+        return level
+
+    def pop(self):
+        """Removes and returns the next pair to compare as a tuple (individual 1, individual 2, `int` separation)
+        :rtype: tuple
+        """
+        if self.__best_first:
+            _, separation, _, individual_1, individual_2 = heapq.heappop(self.__pairs)
+            pair = (individual_1, individual_2, separation)
+        elif self.__breadth_first:
+            pair = self.__pairs.popleft()
+        else:
+            pair = self.__pairs.pop()
+        self.__checked_count += 1
+        return pair
+
+    def is_done(self):
+        """Checks if there are no more pairs to compare, or the pair or time budget has run out
+        :rtype: bool
+        """
+        return not self.__pairs or self.is_over_budget()
+
+    def is_over_budget(self):
+        """Checks if the pair or time budget has run out
+        :rtype: bool
+        """
+        if self.__max_pairs is not None and self.__checked_count >= self.__max_pairs:
+            return True
+        return self.__deadline is not None and time.monotonic() >= self.__deadline
+
+    def get_checked_count(self):
+        """Returns the number of pairs taken from the frontier so far
+        :rtype: int
+        """
+        return self.__checked_count
+
+    def get_pruned_count(self):
+        """Returns the number of pairs dropped for scoring less than the minimum confidence
+        :rtype: int
+        """
+        return self.__pruned_count
+
+
+def score_individuals(individual_1, individual_2, findings=None):
+    """Returns how confident we are that two individuals of different files are the same person
+
+    Uses the rules of `CompareIndividuals` in `compare.py`: gender, surname, birth year and
+    death year add 0.1 each (0.05 if only one year is known), the full given name 0.2 (0.1 for
+    the initial only). Pairs scoring less than 0.4 so far score 0, otherwise matching birth
+    and death dates add 0.2 each, so a perfect match scores 1.
+
+    With a list as `findings`, a line describing each mismatch is appended to it, see
+    `score_facts()`.
+
+    :type individual_1: IndividualElement
+    :type individual_2: IndividualElement
+    :type findings: list of str
+    :rtype: float
+    """
+    return score_facts(individual_1.get_facts(), individual_2.get_facts(), findings)
+
+
+def score_facts(facts_1, facts_2, findings=None):
+    """Returns the score of `score_individuals()` for the facts of two individuals
+
+    With a list as `findings`, a line describing each mismatch is appended to it in the
+    format printed by `compare.py`, e.g. `' - SURNAME MIS-MATCH : Smith vs Smyth\\n'`.
+
+    :type facts_1: IndividualFacts
+    :type facts_2: IndividualFacts
+    :type findings: list of str
+    :rtype: float
+    """
+    score = 0
+
+    if facts_1.gender == facts_2.gender:
+        score = score + 0.1
+    elif findings is not None:
+        findings.append(' - GENDER MIS-MATCH : ' + facts_1.gender + ' vs ' + facts_2.gender + '\n')
+    if facts_1.surname == facts_2.surname:
+        score = score + 0.1
+    elif findings is not None:
+        findings.append(' - SURNAME MIS-MATCH : ' + facts_1.surname + ' vs ' + facts_2.surname + '\n')
+    if facts_1.given_name == facts_2.given_name:
+        score = score + 0.2
+    elif facts_1.given_name[:1] == facts_2.given_name[:1]:
+        score = score + 0.1
+        if findings is not None:
+            findings.append(' - FULL NAME MIS-MATCH, FIRST INITIAL OK : ' + facts_1.given_name + ' vs ' +
+                            facts_2.given_name + '\n')
+    elif findings is not None:
+        findings.append(' - FULL NAME MIS-MATCH : ' + facts_1.given_name + ' vs ' + facts_2.given_name + '\n')
+
+    for event, year_1, year_2 in (('BIRTH', facts_1.birth_year, facts_2.birth_year),
+                                  ('DEATH', facts_1.death_year, facts_2.death_year)):
+        if year_1 == year_2:
+            score = score + 0.1
+        elif year_1 == -1 or year_2 == -1:
+            score += 0.05
+            if findings is not None:
+                findings.append(' - %s YEAR KNOWN VS UNKNOWN : %s vs %s\n' % (event, year_1, year_2))
+        elif findings is not None:
+            findings.append(' - %s YEAR MIS-MATCH : %s vs %s\n' % (event, year_1, year_2))
+
+    if score < 0.4:
+        return 0
+
+    if parse_date(facts_1.birth_date) == parse_date(facts_2.birth_date):
+        score = score + 0.2
+    elif findings is not None:
+        findings.append(' - DOB MIS-MATCH : ' + facts_1.birth_date + ' vs ' + facts_2.birth_date + '\n')
+    if parse_date(facts_1.death_date) == parse_date(facts_2.death_date):
+        score = score + 0.2
+    elif findings is not None:
+        findings.append(' - DOD MIS-MATCH : ' + facts_1.death_date + ' vs ' + facts_2.death_date + '\n')
+    return score
+
+
+class PairScorer(object):
+    """Scores pairs of individuals of two files with `score_individuals()`, optionally in a process pool
+
+    When the pool is started, the facts of all individuals of both lists are taken once and
+    handed to every worker process, so only positions and results are sent between processes.
+    Results are returned in the order of the pairs, and scoring has no side effects, so the
+    scores and findings are the same as when scoring the pairs one after the other.
+
+    Without `workers` greater than one, or for fewer than `MIN_PARALLEL_PAIRS` pairs at a time,
+    pairs are scored in this process. The pool is started on first use; call `close()` or use
+    the scorer as a context manager to shut it down.
+    """
+
+    def __init__(self, individuals_1, individuals_2, workers=None, batch_size=256):
+        """:type individuals_1: list of IndividualElement
+        :type individuals_2: list of IndividualElement
+        :type workers: int
+        :type batch_size: int
+        """
+        self.__individuals_1 = individuals_1
+        self.__individuals_2 = individuals_2
+        self.__positions_1 = {individual.get_pointer(): position for position, individual in enumerate(individuals_1)}
+        self.__positions_2 = {individual.get_pointer(): position for position, individual in enumerate(individuals_2)}
+        self.__workers = workers
+        self.__batch_size = batch_size
+        self.__executor = None
+        self.__results = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        self.close()
+
+    def close(self):
+        """Shuts down the worker processes, if any were started"""
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+    def score_positions(self, position_pairs, with_findings=False):
+        """Scores pairs given as tuples (`int` position 1, `int` position 2) into the two lists
+
+        Returns a list of tuples (`float` score, `list` of `str` findings) in the order of the
+        pairs; the findings are `None` unless `with_findings` is set.
+
+        :type position_pairs: list of tuple
+        :type with_findings: bool
+        :rtype: list of tuple
+        """
+        if self.__workers is None or self.__workers <= 1 or len(position_pairs) < MIN_PARALLEL_PAIRS:
+            results = []
+            for position_1, position_2 in position_pairs:
+                findings = [] if with_findings else None
+                score = score_individuals(self.__individuals_1[position_1], self.__individuals_2[position_2], findings)
+                results.append((score, findings))
+            return results
+
+        if self.__executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            facts_1 = [individual.get_facts() for individual in self.__individuals_1]
+            facts_2 = [individual.get_facts() for individual in self.__individuals_2]
+            self.__executor = ProcessPoolExecutor(max_workers=self.__workers, initializer=_initialize_worker,
+                                                  initargs=(facts_1, facts_2))
+
+        batch_size = self.__batch_size
+        futures = [
+            self.__executor.submit(_score_worker_positions, position_pairs[start:start + batch_size], with_findings)
+            for start in range(0, len(position_pairs), batch_size)
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def prefetch(self, pairs):
+        """Scores pairs of individuals ahead of `score()`, e.g. a level of a `ComparisonFrontier`
+
+        Pairs that have already been prefetched, or whose individuals are not in the lists
+        of the scorer, are skipped.
+
+        :type pairs: list of tuple
+        """
+        keys = []
+        position_pairs = []
+        for individual_1, individual_2 in pairs:
+            key = (individual_1.get_pointer(), individual_2.get_pointer())
+            if key in self.__results or key[0] not in self.__positions_1 or key[1] not in self.__positions_2:
+                continue
+            keys.append(key)
+            position_pairs.append((self.__positions_1[key[0]], self.__positions_2[key[1]]))
+
+        for key, result in zip(keys, self.score_positions(position_pairs, True)):
+            self.__results[key] = result
+
+    def is_prefetched(self, individual_1, individual_2):
+        """Checks if the score of a pair is waiting to be taken by `score()`
+        :type individual_1: IndividualElement
+        :type individual_2: IndividualElement
+        :rtype: bool
+        """
+        return (individual_1.get_pointer(), individual_2.get_pointer()) in self.__results
+
+    def score(self, individual_1, individual_2, findings=None):
+        """Returns the score of `score_individuals()` for a pair, using the prefetched result if there is one
+
+        With a list as `findings`, the mismatches are appended to it.
+
+        :type individual_1: IndividualElement
+        :type individual_2: IndividualElement
+        :type findings: list of str
+        :rtype: float
+        """
+        result = self.__results.pop((individual_1.get_pointer(), individual_2.get_pointer()), None)
+        if result is None:
+            return score_individuals(individual_1, individual_2, findings)
+
+        score, pair_findings = result
+        if findings is not None:
+            findings.extend(pair_findings)
+        return score
+
+
+def _initialize_worker(facts_1, facts_2):
+    """Keeps the facts of both files in a worker process of a `PairScorer`
+    :type facts_1: list of IndividualFacts
+    :type facts_2: list of IndividualFacts
+    """
+    global _worker_facts
+    _worker_facts = (facts_1, facts_2)
+
+
+def _score_worker_positions(position_pairs, with_findings):
+    """Scores pairs of positions in a worker process of a `PairScorer`
+    :type position_pairs: list of tuple
+    :type with_findings: bool
+    :rtype: list of tuple
+    """
+    facts_1, facts_2 = _worker_facts
+    results = []
+    for position_1, position_2 in position_pairs:
+        findings = [] if with_findings else None
+        results.append((score_facts(facts_1[position_1], facts_2[position_2], findings), findings))
+    return results
+
+
+def find_candidate_pairs(individuals_1, individuals_2, min_score=MIN_MATCH_SCORE, decade_tolerance=1, workers=None,
+                         scorer=None):
+    """Scores all pairs of individuals of two lists sharing a block, see `gedcom.blocking.BlockingIndex`
+
+    Returns a list of tuples (`int` position 1, `int` position 2, `float` score) of the pairs
+    scoring at least `min_score`, with positions into the two lists.
+
+    With `workers` greater than one the pairs are scored by a `PairScorer` in a pool of that
+    many processes; the result is the same. Alternatively pass a `scorer` for the same two
+    lists, which is left open, so that its pool can be used again afterwards.
+
+    :type individuals_1: list of IndividualElement
+    :type individuals_2: list of IndividualElement
+    :type min_score: float
+    :type decade_tolerance: int
+    :type workers: int
+    :type scorer: PairScorer
+    :rtype: list of tuple
+    """
+    if scorer is None:
+        with PairScorer(individuals_1, individuals_2, workers) as scorer:
+            return find_candidate_pairs(individuals_1, individuals_2, min_score, decade_tolerance, scorer=scorer)
+
+    positions_2 = {id(individual): position for position, individual in enumerate(individuals_2)}
+    blocking_index = BlockingIndex(individuals_2)
+
+    pairs = []
+    candidates = []
+    for position_1, individual_1 in enumerate(individuals_1):
+        for individual_2 in blocking_index.get_candidates(individual_1, decade_tolerance):
+            candidates.append((position_1, positions_2[id(individual_2)]))
+        if len(candidates) >= _CANDIDATE_CHUNK_SIZE:
+            pairs.extend(_filter_scored(candidates, scorer.score_positions(candidates), min_score))
+            candidates = []
+    pairs.extend(_filter_scored(candidates, scorer.score_positions(candidates), min_score))
+    return pairs
+
+
+def _filter_scored(position_pairs, results, min_score):
+    """Returns tuples (`int` position 1, `int` position 2, `float` score) of the pairs scoring at least `min_score`
+    :type position_pairs: list of tuple
+    :type results: list of tuple
+    :type min_score: float
+    :rtype: list of tuple
+    """
+    return [
+        (position_1, position_2, score) for (position_1, position_2), (score, _) in zip(position_pairs, results)
+        if score and score >= min_score
+    ]
+
+
+def match_individuals(individuals_1, individuals_2, min_score=MIN_MATCH_SCORE, refine=False,
+                      decade_tolerance=1, workers=None, scorer=None):
+    """Matches the individuals of two files one-to-one, e.g. all individuals of two trees
+
+    Candidate pairs are found by `find_candidate_pairs()`. Pairs are then accepted greedily
+    from the highest score down, skipping individuals that have already been matched; ties go
+    to the pair earliest in the lists. With `refine`, each block with at most
+    `MAX_REFINED_BLOCK_SIZE` individuals on both sides is instead assigned by the Hungarian
+    method, maximising the total score of its matches. `workers` and `scorer` are passed on to
+    `find_candidate_pairs()`.
+
+    Returns a list of tuples (`IndividualElement` individual 1, `IndividualElement` individual 2,
+    `float` score) in the order of the first list.
+
+    :type individuals_1: list of IndividualElement
+    :type individuals_2: list of IndividualElement
+    :type min_score: float
+    :type refine: bool
+    :type decade_tolerance: int
+    :type workers: int
+    :type scorer: PairScorer
+    :rtype: list of tuple
+    """
+    pairs = find_candidate_pairs(individuals_1, individuals_2, min_score, decade_tolerance, workers, scorer)
+
+    matches = {}
+    if refine:
+        blocks = {}
+        for pair in pairs:
+            blocks.setdefault(get_blocking_key(individuals_1[pair[0]]), []).append(pair)
+        pairs = []
+        for block_pairs in blocks.values():
+            positions_1 = sorted(set(pair[0] for pair in block_pairs))
+            positions_2 = sorted(set(pair[1] for pair in block_pairs))
+            if max(len(positions_1), len(positions_2)) > MAX_REFINED_BLOCK_SIZE:
+                pairs.extend(block_pairs)
+                continue
+            for pair in _assign(block_pairs, positions_1, positions_2):
+                matches[pair[0]] = pair
+
+    pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+    matched_2 = set(pair[1] for pair in matches.values())
+    for pair in pairs:
+        if pair[0] not in matches and pair[1] not in matched_2:
+            matches[pair[0]] = pair
+            matched_2.add(pair[1])
+
+    return [
+        (individuals_1[position_1], individuals_2[matches[position_1][1]], matches[position_1][2])
+        for position_1 in sorted(matches)
+    ]
+
+
+def _assign(pairs, positions_1, positions_2):
+    """Returns the pairs of a block with the highest total score, each position used at most once
+
+    Uses the Hungarian method on the matrix of scores of the block, pairs missing from the
+    block score 0 and are never returned.
+
+    :type pairs: list of tuple
+    :type positions_1: list of int
+    :type positions_2: list of int
+    :rtype: list of tuple
+    """
+    rows = {position: row for row, position in enumerate(positions_1)}
+    columns = {position: column for column, position in enumerate(positions_2)}
+    transposed = len(positions_1) > len(positions_2)
+    if transposed:
+        rows, columns = columns, rows
+
+    # Costs are negated scores, the method needs at least as many columns as rows
+    row_count = len(rows)
+    column_count = len(columns)
+    costs = [[0.0] * column_count for _ in range(row_count)]
+    block_pairs = {}
+    for pair in pairs:
+        row = rows[pair[1] if transposed else pair[0]]
+        column = columns[pair[0] if transposed else pair[1]]
+        costs[row][column] = -pair[2]
+        block_pairs[row, column] = pair
+
+    infinity = float('inf')
+    row_potentials = [0.0] * (row_count + 1)
+    column_potentials = [0.0] * (column_count + 1)
+    column_rows = [0] * (column_count + 1)
+    previous_columns = [0] * (column_count + 1)
+    for row in range(1, row_count + 1):
+        column_rows[0] = row
+        column = 0
+        minimums = [infinity] * (column_count + 1)
+        used = [False] * (column_count + 1)
+        while column_rows[column] != 0:
+            used[column] = True
+            current_row = column_rows[column]
+            delta = infinity
+            next_column = 0
+            for candidate in range(1, column_count + 1):
+                if not used[candidate]:
+                    reduced = costs[current_row - 1][candidate - 1] - row_potentials[current_row] - \
+                        column_potentials[candidate]
+                    if reduced < minimums[candidate]:
+                        minimums[candidate] = reduced
+                        previous_columns[candidate] = column
+                    if minimums[candidate] < delta:
+                        delta = minimums[candidate]
+                        next_column = candidate
+            for candidate in range(column_count + 1):
+                if used[candidate]:
+                    row_potentials[column_rows[candidate]] += delta
+                    column_potentials[candidate] -= delta
+                else:
+                    minimums[candidate] -= delta
+            column = next_column
+        while column:
+            previous_column = previous_columns[column]
+            column_rows[column] = column_rows[previous_column]
+            column = previous_column
+
+    return [
+        block_pairs[column_rows[column] - 1, column - 1] for column in range(1, column_count + 1)
+        if column_rows[column] and (column_rows[column] - 1, column - 1) in block_pairs
+    ]
@@ -0,0 +1,788 @@
+# -*- coding: utf-8 -*-
+
+# Python GEDCOM Parser
+#
+# Copyright (C) 2018 Damon Brodie (damon.brodie at gmail.com)
+# Copyright (C) 2018-2019 Nicklas Reincke (contact at reynke.com)
+# Copyright (C) 2016 Andreas Oberritter
+# Copyright (C) 2012 Madeleine Price Ball
+# Copyright (C) 2005 Daniel Zappala (zappala at cs.byu.edu)
+# Copyright (C) 2005 Brigham Young University
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Further information about the license: http://www.gnu.org/licenses/gpl-2.0.html
+
+from array import array
+from gedcom.element.family import FamilyElement
+from gedcom.element.individual import IndividualElement
+import gedcom.tags
+
+# Value of `_FREL` and `_MREL` lines marking a child as the natural child of the father or mother
+RELATION_NATURAL = "Natural"
+
+# Tags of the lines a relationship graph is built from
+RELATIONSHIP_TAGS = frozenset([
+    gedcom.tags.GEDCOM_TAG_INDIVIDUAL,
+    gedcom.tags.GEDCOM_TAG_FAMILY,
+    gedcom.tags.GEDCOM_TAG_FAMILY_CHILD,
+    gedcom.tags.GEDCOM_TAG_FAMILY_SPOUSE,
+    gedcom.tags.GEDCOM_TAG_HUSBAND,
+    gedcom.tags.GEDCOM_TAG_WIFE,
+    gedcom.tags.GEDCOM_TAG_CHILD,
+    gedcom.tags.GEDCOM_PROGRAM_DEFINED_TAG_FREL,
+    gedcom.tags.GEDCOM_PROGRAM_DEFINED_TAG_MREL,
+])
+
+# Steps of a path between two individuals: to a parent, to a child or to a spouse
+STEP_PARENT = "PARENT"
+STEP_CHILD = "CHILD"
+STEP_SPOUSE = "SPOUSE"
+
+# Terms for relatives by gender: male, female, unknown
+_PARENT_TERMS = ("father", "mother", "parent")
+_CHILD_TERMS = ("son", "daughter", "child")
+_SIBLING_TERMS = ("brother", "sister", "sibling")
+_PARENT_SIBLING_TERMS = ("uncle", "aunt", "aunt or uncle")
+_SIBLING_CHILD_TERMS = ("nephew", "niece", "niece or nephew")
+_SPOUSE_TERMS = ("husband", "wife", "spouse")
+
+
+class RelationshipGraph(object):
+    """Parents, children and spouses of all individuals of a parsed GEDCOM file
+
+    Built in one pass over the records of a `Parser`. Every individual gets an integer id,
+    in the order of `Parser.get_element_dictionary()`, and the relations are stored as
+    compressed sparse rows: for each kind of relation one array of neighbour ids and one
+    array of offsets into it per individual, so looking up the neighbours of an individual
+    is a slice of an array.
+
+    Relations follow the pointers the way `Parser.get_parents()` and `Parser.get_families()`
+    do: the parents of an individual are the `HUSB` and `WIFE` members of the families listed
+    by its `FAMC` lines, its spouses and children are the other `HUSB` and `WIFE` members and
+    the `CHIL` members of the families listed by its `FAMS` lines. A parent relation is natural
+    when the `CHIL` line of the individual in the family has a `_FREL` (for `HUSB`) or `_MREL`
+    (for `WIFE`) line with the value `Natural`. Pointers to records that are not individuals
+    are ignored.
+
+    The graph is a snapshot; `Parser.get_relationship_graph()` builds a new one after the
+    tree has been changed.
+    """
+
+    def __init__(self, parser):
+        """Builds the graph of all individuals of a parser
+
+        :type parser: gedcom.parser.Parser
+        """
+        element_dictionary = parser.get_element_dictionary()
+
+        self.__individuals = []
+        self.__ids = {}
+        for pointer, record in element_dictionary.items():
+            if isinstance(record, IndividualElement):
+                self.__ids[pointer] = len(self.__individuals)
+                self.__individuals.append(record)
+
+        self.__parent_offsets = array('i', [0])
+        self.__parent_ids = array('i')
+        self.__natural_flags = array('B')
+        self.__child_offsets = array('i', [0])
+        self.__child_ids = array('i')
+        self.__spouse_offsets = array('i', [0])
+        self.__spouse_ids = array('i')
+
+        # Reverse relations, only built when paths are searched
+        self.__reverse_relations = None
+
+        families = {}
+        for individual_id, individual in enumerate(self.__individuals):
+            for element in individual.get_child_elements():
+                tag = element.get_tag()
+                if tag != gedcom.tags.GEDCOM_TAG_FAMILY_CHILD and tag != gedcom.tags.GEDCOM_TAG_FAMILY_SPOUSE:
+                    continue
+
+                family_pointer = element.get_value()
+                family = families.get(family_pointer)
+                if family is None:
+                    family_element = element_dictionary.get(family_pointer)
+                    if not isinstance(family_element, FamilyElement):
+                        continue
+                    family = families[family_pointer] = self.__read_family(family_element)
+                parents, children, natural_roles = family
+
+                if tag == gedcom.tags.GEDCOM_TAG_FAMILY_CHILD:
+                    roles = natural_roles.get(individual_id, ())
+                    for parent_id, role in parents:
+                        self.__parent_ids.append(parent_id)
+                        self.__natural_flags.append(role in roles)
+                else:
+                    for parent_id, role in parents:
+                        if parent_id != individual_id:
+                            self.__spouse_ids.append(parent_id)
+                    self.__child_ids.extend(children)
+
+            self.__parent_offsets.append(len(self.__parent_ids))
+            self.__child_offsets.append(len(self.__child_ids))
+            self.__spouse_offsets.append(len(self.__spouse_ids))
+
+    def __len__(self):
+        """Returns the number of individuals
+        :rtype: int
+        """
+        return len(self.__individuals)
+
+    def get_id(self, individual):
+        """Returns the id of an individual, or `None` if it is not part of the graph
+        :type individual: IndividualElement
+        :rtype: int
+        """
+        return self.__ids.get(individual.get_pointer())
+
+    def get_individual(self, individual_id):
+        """Returns the individual with the given id
+        :type individual_id: int
+        :rtype: IndividualElement
+        """
+        return self.__individuals[individual_id]
+
+    def get_parent_ids(self, individual_id, natural_only=False):
+        """Returns the ids of the parents of an individual, optionally only of its natural parents
+        :type individual_id: int
+        :type natural_only: bool
+        :rtype: list of int
+        """
+        start = self.__parent_offsets[individual_id]
+        end = self.__parent_offsets[individual_id + 1]
+        if natural_only:
+            natural_flags = self.__natural_flags
+            return [self.__parent_ids[edge] for edge in range(start, end) if natural_flags[edge]]
+        return self.__parent_ids[start:end].tolist()
+
+    def get_child_ids(self, individual_id):
+        """Returns the ids of the children of an individual
+        :type individual_id: int
+        :rtype: list of int
+        """
+        return self.__child_ids[self.__child_offsets[individual_id]:self.__child_offsets[individual_id + 1]].tolist()
+
+    def get_spouse_ids(self, individual_id):
+        """Returns the ids of the spouses of an individual
+        :type individual_id: int
+        :rtype: list of int
+        """
+        return self.__spouse_ids[self.__spouse_offsets[individual_id]:self.__spouse_offsets[individual_id + 1]].tolist()
+
+    def get_parents(self, individual, parent_type="ALL"):
+        """Returns the parents of an individual
+
+        Optional parent_type. Default "ALL" returns all parents. "NAT" can be
+        used to specify only natural (genetic) parents.
+
+        :type individual: IndividualElement
+        :type parent_type: str
+        :rtype: list of IndividualElement
+        """
+        individual_id = self.get_id(individual)
+        if individual_id is None:
+            return []
+        return [self.__individuals[parent_id] for parent_id in self.get_parent_ids(individual_id, parent_type == "NAT")]
+
+    def get_children(self, individual):
+        """Returns the children of an individual
+        :type individual: IndividualElement
+        :rtype: list of IndividualElement
+        """
+        individual_id = self.get_id(individual)
+        if individual_id is None:
+            return []
+        return [self.__individuals[child_id] for child_id in self.get_child_ids(individual_id)]
+
+    def get_spouses(self, individual):
+        """Returns the spouses of an individual
+        :type individual: IndividualElement
+        :rtype: list of IndividualElement
+        """
+        individual_id = self.get_id(individual)
+        if individual_id is None:
+            return []
+        return [self.__individuals[spouse_id] for spouse_id in self.get_spouse_ids(individual_id)]
+
+    def get_ancestor_generations(self, individual_id, natural_only=False, memo=None):
+        """Returns the ancestors of an individual as a dictionary of ancestor id to generation
+
+        The generation of an ancestor is the smallest number of parent relations between the
+        individual and the ancestor, 1 for parents. Every ancestor appears once however many
+        lines lead to it, and cycles in bad data are followed only once; the individual itself
+        is never included.
+
+        `memo` is a dictionary of individual id to the result of this method, shared between
+        calls to reuse the ancestors of ancestors that have been computed before. It is filled
+        with the results for the individual and all of its ancestors.
+
+        :type individual_id: int
+        :type natural_only: bool
+        :type memo: dict
+        :rtype: dict of int
+        """
+        if memo is None:
+            memo = {}
+        if individual_id in memo:
+            return memo[individual_id]
+
+        # Iterative post-order walk, so every parent is done before its children
+        stack = [(individual_id, iter(self.get_parent_ids(individual_id, natural_only)))]
+        on_stack = set([individual_id])
+        while stack:
+            node_id, parent_ids = stack[-1]
+            for parent_id in parent_ids:
+                if parent_id not in memo and parent_id not in on_stack:
+                    stack.append((parent_id, iter(self.get_parent_ids(parent_id, natural_only))))
+                    on_stack.add(parent_id)
+                    break
+            else:
+                stack.pop()
+                on_stack.discard(node_id)
+                memo[node_id] = self.__merge_ancestor_generations(node_id, natural_only, memo)
+
+        return memo[individual_id]
+
+    def find_path_ids(self, from_id, to_id, natural_only=False, steps=(STEP_PARENT, STEP_CHILD, STEP_SPOUSE),
+                      max_length=None):
+        """Returns a shortest path between two individuals, or `None` if they are not connected
+
+        Searches breadth first from both individuals at once, always extending the smaller
+        frontier, so only about the square root of the individuals a one-sided search would
+        visit are visited. The search from the second individual follows the relations
+        backwards, so every step of the path is a relation as recorded for the individual it
+        starts from. `steps` are the kinds of steps the path may take; with `natural_only`
+        only natural parents and children are followed. Optional `max_length` gives up on
+        paths longer than that many steps. The reverse relations are built on the first call.
+
+        The path is returned as a tuple (`list` of `int` ids from the first to the second
+        individual, `list` of `STEP_*` constants, one for each step).
+
+        :type from_id: int
+        :type to_id: int
+        :type natural_only: bool
+        :type steps: tuple of str
+        :type max_length: int
+        :rtype: tuple
+        """
+        if from_id == to_id:
+            return [from_id], []
+
+        if self.__reverse_relations is None:
+            self.__reverse_relations = (
+                self.__reverse(self.__parent_offsets, self.__parent_ids, self.__natural_flags),
+                self.__reverse(self.__child_offsets, self.__child_ids),
+                self.__reverse(self.__spouse_offsets, self.__spouse_ids),
+            )
+
+        # Per side: id -> (id it was reached from, step between the two in path order)
+        previous = ({from_id: None}, {to_id: None})
+        frontiers = ([from_id], [to_id])
+        get_neighbours = (self.__get_neighbours, self.__get_reverse_neighbours)
+        steps = frozenset(steps)
+        length = 0
+
+        while frontiers[0] and frontiers[1] and (max_length is None or length < max_length):
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            reached = previous[side]
+            other_reached = previous[1 - side]
+            next_frontier = []
+
+            for node_id in frontiers[side]:
+                for neighbour_id, step in get_neighbours[side](node_id, natural_only, steps):
+                    if neighbour_id in reached:
+                        continue
+                    reached[neighbour_id] = (node_id, step)
+                    if neighbour_id in other_reached:
+                        return self.__join_paths(neighbour_id, previous)
+                    next_frontier.append(neighbour_id)
+
+            frontiers[side][:] = next_frontier
+            length += 1
+
+        return None
+
+    def get_relationship(self, individual, relative, natural_only=False, include_spouses=True, max_length=None):
+        """Returns how a relative is related to an individual, or `None` if they are not connected
+
+        Finds a shortest path of parent, child and, unless `include_spouses` is false, spouse
+        relations with `find_path_ids()`.
+
+        :type individual: IndividualElement
+        :type relative: IndividualElement
+        :type natural_only: bool
+        :type include_spouses: bool
+        :type max_length: int
+        :rtype: Relationship
+        """
+        individual_id = self.get_id(individual)
+        relative_id = self.get_id(relative)
+        if individual_id is None or relative_id is None:
+            return None
+
+        steps = (STEP_PARENT, STEP_CHILD, STEP_SPOUSE) if include_spouses else (STEP_PARENT, STEP_CHILD)
+        path = self.find_path_ids(individual_id, relative_id, natural_only, steps, max_length)
+        if path is None:
+            return None
+
+        path_ids, path_steps = path
+        return Relationship([self.__individuals[path_id] for path_id in path_ids], path_steps)
+
+    def __get_neighbours(self, individual_id, natural_only, steps):
+        """Returns the relatives one step away from an individual as tuples (`int` id, `str` step)
+        :type individual_id: int
+        :type natural_only: bool
+        :type steps: frozenset of str
+        :rtype: list of tuple
+        """
+        neighbours = []
+        if STEP_PARENT in steps:
+            neighbours.extend((parent_id, STEP_PARENT) for parent_id in self.get_parent_ids(individual_id, natural_only))
+        if STEP_CHILD in steps:
+            for child_id in self.get_child_ids(individual_id):
+                if not natural_only or individual_id in self.get_parent_ids(child_id, True):
+                    neighbours.append((child_id, STEP_CHILD))
+        if STEP_SPOUSE in steps:
+            neighbours.extend((spouse_id, STEP_SPOUSE) for spouse_id in self.get_spouse_ids(individual_id))
+        return neighbours
+
+    def __get_reverse_neighbours(self, individual_id, natural_only, steps):
+        """Returns the relatives having an individual one step away as tuples (`int` id, `str` step)
+        :type individual_id: int
+        :type natural_only: bool
+        :type steps: frozenset of str
+        :rtype: list of tuple
+        """
+        (parent_offsets, parent_ids, natural_flags), (child_offsets, child_ids, _), (spouse_offsets, spouse_ids, _) = \
+            self.__reverse_relations
+        neighbours = []
+        if STEP_PARENT in steps:
+            for edge in range(parent_offsets[individual_id], parent_offsets[individual_id + 1]):
+                if not natural_only or natural_flags[edge]:
+                    neighbours.append((parent_ids[edge], STEP_PARENT))
+        if STEP_CHILD in steps:
+            for parent_id in child_ids[child_offsets[individual_id]:child_offsets[individual_id + 1]]:
+                if not natural_only or parent_id in self.get_parent_ids(individual_id, True):
+                    neighbours.append((parent_id, STEP_CHILD))
+        if STEP_SPOUSE in steps:
+            neighbours.extend(
+                (spouse_id, STEP_SPOUSE)
+                for spouse_id in spouse_ids[spouse_offsets[individual_id]:spouse_offsets[individual_id + 1]]
+            )
+        return neighbours
+
+    def __reverse(self, offsets, ids, flags=None):
+        """Returns the reverse of a relation stored as compressed sparse rows
+        :type offsets: array
+        :type ids: array
+        :type flags: array
+        :rtype: tuple
+        """
+        reverse_offsets = array('i', [0]) * (len(self.__individuals) + 1)
+        for target_id in ids:
+            reverse_offsets[target_id + 1] += 1
+        for individual_id in range(len(self.__individuals)):
+            reverse_offsets[individual_id + 1] += reverse_offsets[individual_id]
+
+        positions = reverse_offsets[:-1]
+        reverse_ids = array('i', [0]) * len(ids)
+        reverse_flags = array('B', [0]) * len(ids) if flags is not None else None
+        for source_id in range(len(self.__individuals)):
+            for edge in range(offsets[source_id], offsets[source_id + 1]):
+                target_id = ids[edge]
+                reverse_ids[positions[target_id]] = source_id
+                if flags is not None:
+                    reverse_flags[positions[target_id]] = flags[edge]
+                positions[target_id] += 1
+
+        return reverse_offsets, reverse_ids, reverse_flags
+
+    @staticmethod
+    def __join_paths(meeting_id, previous):
+        """Joins the two halves of a path found by `find_path_ids()` where they meet
+        :type meeting_id: int
+        :type previous: tuple of dict
+        :rtype: tuple
+        """
+        path_ids = []
+        path_steps = []
+
+        node_id = meeting_id
+        while previous[0][node_id] is not None:
+            path_ids.append(node_id)
+            node_id, step = previous[0][node_id]
+            path_steps.append(step)
+        path_ids.append(node_id)
+        path_ids.reverse()
+        path_steps.reverse()
+
+        node_id = meeting_id
+        while previous[1][node_id] is not None:
+            node_id, step = previous[1][node_id]
+            path_ids.append(node_id)
+            path_steps.append(step)
+
+        return path_ids, path_steps
+
+    def __merge_ancestor_generations(self, individual_id, natural_only, memo):
+        """Returns the ancestors of an individual from the memoized ancestors of its parents
+
+        A parent without memoized ancestors lies on a cycle back to the individual; from there
+        on ancestors are searched breadth first, still merging memoized ancestors where found.
+
+        :type individual_id: int
+        :type natural_only: bool
+        :type memo: dict
+        :rtype: dict of int
+        """
+        generations = {}
+        frontier = [individual_id]
+        seen = set(frontier)
+        generation = 0
+
+        while frontier:
+            generation += 1
+            next_frontier = []
+            for node_id in frontier:
+                for parent_id in self.get_parent_ids(node_id, natural_only):
+                    if parent_id in seen:
+                        continue
+                    seen.add(parent_id)
+                    if generations.get(parent_id, generation + 1) > generation:
+                        generations[parent_id] = generation
+
+                    parent_generations = memo.get(parent_id)
+                    if parent_generations is None:
+                        next_frontier.append(parent_id)
+                        continue
+                    for ancestor_id, ancestor_generation in parent_generations.items():
+                        ancestor_generation += generation
+                        if generations.get(ancestor_id, ancestor_generation + 1) > ancestor_generation:
+                            generations[ancestor_id] = ancestor_generation
+            frontier = next_frontier
+
+        generations.pop(individual_id, None)
+        return generations
+
+    def __read_family(self, family):
+        """Returns the members of a family as a tuple (`list` of (`int` id, `str` tag) for
+        `HUSB` and `WIFE` lines, `list` of `int` child ids, `dict` of child id to the set of
+        tags of its natural parents)
+        :type family: FamilyElement
+        :rtype: tuple
+        """
+        parents = []
+        children = []
+        natural_roles = {}
+
+        for element in family.get_child_elements():
+            member_id = self.__ids.get(element.get_value())
+            if member_id is None:
+                continue
+
+            tag = element.get_tag()
+            if tag == gedcom.tags.GEDCOM_TAG_HUSBAND or tag == gedcom.tags.GEDCOM_TAG_WIFE:
+                parents.append((member_id, tag))
+            elif tag == gedcom.tags.GEDCOM_TAG_CHILD:
+                children.append(member_id)
+                for relation in element.get_child_elements():
+                    if relation.get_value() != RELATION_NATURAL:
+                        continue
+                    if relation.get_tag() == gedcom.tags.GEDCOM_PROGRAM_DEFINED_TAG_FREL:
+                        natural_roles.setdefault(member_id, set()).add(gedcom.tags.GEDCOM_TAG_HUSBAND)
+                    elif relation.get_tag() == gedcom.tags.GEDCOM_PROGRAM_DEFINED_TAG_MREL:
+                        natural_roles.setdefault(member_id, set()).add(gedcom.tags.GEDCOM_TAG_WIFE)
+
+        return parents, children, natural_roles
+
+
+class Relationship(object):
+    """A shortest path between two individuals, see `RelationshipGraph.get_relationship()`
+
+    The label describes the last individual of the path from the point of view of the first
+    one, e.g. "2nd cousin once removed" or "father of wife". It is built from the blood
+    relationships between spouse steps and uses the gender of each relative where known.
+    """
+
+    def __init__(self, path, steps):
+        """:type path: list of IndividualElement
+        :type steps: list of str
+        """
+        self.__path = path
+        self.__steps = steps
+        self.__common_ancestor = None
+        self.__label = self.__build_label()
+
+    def get_path(self):
+        """Returns the individuals along the path, starting with the individual and ending with the relative
+        :rtype: list of IndividualElement
+        """
+        return self.__path
+
+    def get_steps(self):
+        """Returns the `STEP_*` constant of each step of the path
+        :rtype: list of str
+        """
+        return self.__steps
+
+    def get_length(self):
+        """Returns the number of steps of the path
+        :rtype: int
+        """
+        return len(self.__steps)
+
+    def get_common_ancestor(self):
+        """Returns the closest common ancestor of blood relatives, `None` for other relationships
+
+        For direct ancestors or descendants this is the ancestor itself.
+
+        :rtype: IndividualElement
+        """
+        return self.__common_ancestor
+
+    def get_label(self):
+        """Returns the relationship of the relative to the individual in words
+        :rtype: str
+        """
+        return self.__label
+
+    def __build_label(self):
+        """Splits the path into blood relationships and spouse steps and names each of them
+        :rtype: str
+        """
+        steps = self.__steps
+        if not steps:
+            self.__common_ancestor = self.__path[0]
+            return "self"
+
+        terms = []
+        index = 0
+        while index < len(steps):
+            if steps[index] == STEP_SPOUSE:
+                index += 1
+                terms.append(_SPOUSE_TERMS[self.__get_gender_index(index)])
+                continue
+
+            start = index
+            while index < len(steps) and steps[index] == STEP_PARENT:
+                index += 1
+            generations_up = index - start
+            while index < len(steps) and steps[index] == STEP_CHILD:
+                index += 1
+            generations_down = index - start - generations_up
+
+            if start == 0 and index == len(steps):
+                self.__common_ancestor = self.__path[generations_up]
+            terms.append(_get_blood_term(generations_up, generations_down, self.__get_gender_index(index)))
+
+        return " of ".join(reversed(terms))
+
+    def __get_gender_index(self, index):
+        """Returns the index into the `_*_TERMS` tuples for the gender of an individual on the path
+        :type index: int
+        :rtype: int
+        """
+        gender = self.__path[index].get_gender()
+        if gender == "M":
+            return 0
+        if gender == "F":
+            return 1
+        return 2
+
+
+class KinshipIndex(object):
+    """Memoized ancestors of the individuals of a `RelationshipGraph` for bulk kinship queries
+
+    The ancestors of every individual queried, and of all of their ancestors, are computed
+    once with `RelationshipGraph.get_ancestor_generations()` and kept as dictionaries of
+    ancestor id to generation. Finding the closest common ancestors of two individuals is
+    then one pass over the smaller of their two ancestries, independent of the size of the
+    tree, which makes relating thousands of individuals to one person cheap.
+
+    Kinship is blood relationship: spouses are never followed. Use `natural_only` for
+    genetic kinship, e.g. for DNA matches.
+    """
+
+    def __init__(self, graph, natural_only=False):
+        """:type graph: RelationshipGraph
+        :type natural_only: bool
+        """
+        self.__graph = graph
+        self.__natural_only = natural_only
+        self.__memo = {}
+
+    def get_graph(self):
+        """Returns the graph this index was built for
+        :rtype: RelationshipGraph
+        """
+        return self.__graph
+
+    def precompute(self):
+        """Computes the ancestors of all individuals up front instead of on first use"""
+        for individual_id in range(len(self.__graph)):
+            self.get_ancestor_generations(individual_id)
+
+    def get_ancestor_generations(self, individual_id):
+        """Returns the ancestors of an individual as a dictionary of ancestor id to generation
+        :type individual_id: int
+        :rtype: dict of int
+        """
+        ancestor_generations = self.__memo.get(individual_id)
+        if ancestor_generations is None:
+            ancestor_generations = self.__graph.get_ancestor_generations(individual_id, self.__natural_only,
+                                                                         self.__memo)
+        return ancestor_generations
+
+    def get_common_ancestor_ids(self, individual_id, relative_id):
+        """Returns the closest common ancestors of two individuals
+
+        An individual counts as its own ancestor of generation 0, so for direct ancestors the
+        ancestor itself is returned. Returns a tuple (`list` of `int` ids of the common
+        ancestors with the smallest total number of generations to both individuals, `int`
+        generations from the individual, `int` generations from the relative), or `None` if
+        the two have no common ancestor. For several closest common ancestors, e.g. the two
+        parents of siblings, the generations are the same for all of them unless pedigree
+        collapse makes them differ, in which case those of the first ancestor are returned.
+
+        :type individual_id: int
+        :type relative_id: int
+        :rtype: tuple
+        """
+        generations = self.get_ancestor_generations(individual_id)
+        relative_generations = self.get_ancestor_generations(relative_id)
+
+        if individual_id == relative_id:
+            return [individual_id], 0, 0
+        if individual_id in relative_generations:
+            return [individual_id], 0, relative_generations[individual_id]
+        if relative_id in generations:
+            return [relative_id], generations[relative_id], 0
+
+        smaller, larger, swapped = generations, relative_generations, False
+        if len(smaller) > len(larger):
+            smaller, larger, swapped = larger, smaller, True
+
+        closest_ids = []
+        closest_generations = None
+        for ancestor_id, generation in smaller.items():
+            other_generation = larger.get(ancestor_id)
+            if other_generation is None:
+                continue
+            total = generation + other_generation
+            if closest_generations is None or total < closest_generations[0] + closest_generations[1]:
+                closest_ids = [ancestor_id]
+                closest_generations = (generation, other_generation)
+            elif total == closest_generations[0] + closest_generations[1]:
+                closest_ids.append(ancestor_id)
+
+        if closest_generations is None:
+            return None
+        if swapped:
+            closest_generations = (closest_generations[1], closest_generations[0])
+        closest_ids.sort()
+        return closest_ids, closest_generations[0], closest_generations[1]
+
+    def get_kinship(self, individual, relative):
+        """Returns the closest common ancestors of two individuals and their blood relationship
+
+        Returns a tuple (`list` of `IndividualElement` closest common ancestors, `int`
+        generations from the individual, `int` generations from the relative, `str` label of
+        the relative as seen from the individual), or `None` if they are not blood relatives.
+        The degree of kinship is the sum of the two generation counts.
+
+        :type individual: IndividualElement
+        :type relative: IndividualElement
+        :rtype: tuple
+        """
+        individual_id = self.__graph.get_id(individual)
+        relative_id = self.__graph.get_id(relative)
+        if individual_id is None or relative_id is None:
+            return None
+
+        common_ancestors = self.get_common_ancestor_ids(individual_id, relative_id)
+        if common_ancestors is None:
+            return None
+
+        ancestor_ids, generations_up, generations_down = common_ancestors
+        if generations_up == 0 and generations_down == 0:
+            label = "self"
+        else:
+            gender = relative.get_gender()
+            label = _get_blood_term(generations_up, generations_down, 0 if gender == "M" else 1 if gender == "F" else 2)
+
+        return ([self.__graph.get_individual(ancestor_id) for ancestor_id in ancestor_ids], generations_up,
+                generations_down, label)
+
+
+def _get_ordinal(number):
+    """Returns a number as an English ordinal, e.g. "2nd"
+    :type number: int
+    :rtype: str
+    """
+    if number % 100 in (11, 12, 13):
+        return "%dth" % number
+    return "%d%s" % (number, {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th"))
+
+
+def _get_great_prefix(greats):
+    """Returns the prefix for a number of additional generations, e.g. "2nd great-"
+    :type greats: int
+    :rtype: str
+    """
+    if greats == 0:
+        return ""
+    if greats == 1:
+        return "great-"
+    return "%s great-" % _get_ordinal(greats)
+
+
+def _get_blood_term(generations_up, generations_down, gender_index):
+    """Names a blood relative reached by going up to a common ancestor and back down
+    :type generations_up: int
+    :type generations_down: int
+    :type gender_index: int
+    :rtype: str
+    """
+    if generations_down == 0:
+        if generations_up == 1:
+            return _PARENT_TERMS[gender_index]
+        return _get_great_prefix(generations_up - 2) + "grand" + _PARENT_TERMS[gender_index]
+
+    if generations_up == 0:
+        if generations_down == 1:
+            return _CHILD_TERMS[gender_index]
+        return _get_great_prefix(generations_down - 2) + "grand" + _CHILD_TERMS[gender_index]
+
+    if generations_up == 1 and generations_down == 1:
+        return _SIBLING_TERMS[gender_index]
+
+    if generations_down == 1:
+        return _get_great_prefix(generations_up - 2) + _PARENT_SIBLING_TERMS[gender_index]
+
+    if generations_up == 1:
+        return _get_great_prefix(generations_down - 2) + _SIBLING_CHILD_TERMS[gender_index]
+
+    term = "%s cousin" % _get_ordinal(min(generations_up, generations_down) - 1)
+    removed = abs(generations_up - generations_down)
+    if removed == 1:
+        term += " once removed"
+    elif removed == 2:
+        term += " twice removed"
+    elif removed > 2:
+        term += " %d times removed" % removed
+    return term
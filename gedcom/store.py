@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+
+# Python GEDCOM Parser
+#
+# Copyright (C) 2018 Damon Brodie (damon.brodie at gmail.com)
+# Copyright (C) 2018-2019 Nicklas Reincke (contact at reynke.com)
+# Copyright (C) 2016 Andreas Oberritter
+# Copyright (C) 2012 Madeleine Price Ball
+# Copyright (C) 2005 Daniel Zappala (zappala at cs.byu.edu)
+# Copyright (C) 2005 Brigham Young University
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Further information about the license: http://www.gnu.org/licenses/gpl-2.0.html
+
+from array import array
+from gedcom.element.element import Element
+from gedcom.element.family import FamilyElement
+from gedcom.element.file import FileElement
+from gedcom.element.individual import IndividualElement
+from gedcom.element.object import ObjectElement
+from gedcom.element.root import RootElement
+import gedcom.tags
+
+# Index of the virtual root element in every store
+ROOT_INDEX = 0
+
+# Marks a missing parent, child or sibling
+NO_INDEX = -1
+
+
+class ReadOnlyElementError(Exception):
+    pass
+
+
+class ElementStore(object):
+    """Parsed GEDCOM data stored as parallel arrays instead of one object per line
+
+    Every line is a row across the arrays: level, tag id, pointer id, line ending id, offset
+    and length of the value within one UTF-8 text buffer, and the indexes of the parent, the
+    first child and the next sibling. Row 0 is the virtual root element.
+
+    `get_element()` returns lightweight, read-only views that behave like the regular element
+    classes, so `Parser` and the `IndividualElement` getters work unchanged on top of a store.
+    Views compare equal when they refer to the same row. Views of the root element and of
+    records (level 0) are kept once created, so the facts cached by an `IndividualElementView`
+    are reused; this costs one view per record looked up. Views of all other lines are created
+    on demand and not kept, as there are many more of them.
+
+    The arrays hold no Python objects per row, so a store is a fraction of the size of an
+    element tree, pickles compactly, and forked worker processes can read it without copying.
+    """
+
+    def __init__(self):
+        """Initialize a store containing only the root element"""
+        self.__levels = array('i', [-1])
+        self.__tag_ids = array('H', [0])
+        self.__pointer_ids = array('i', [0])
+        self.__crlf_ids = array('B', [0])
+        self.__value_offsets = array('q', [0])
+        self.__value_lengths = array('I', [0])
+        self.__parents = array('i', [NO_INDEX])
+        self.__first_children = array('i', [NO_INDEX])
+        self.__next_siblings = array('i', [NO_INDEX])
+
+        self.__tags = ["ROOT"]
+        self.__tag_ids_by_tag = {"ROOT": 0}
+        self.__pointers = [""]
+        self.__pointer_ids_by_pointer = {"": 0}
+        self.__crlfs = ["\n"]
+        self.__crlf_ids_by_crlf = {"\n": 0}
+        self.__text = bytearray()
+
+        # Views of the root element and of records by row, see `get_element()`
+        self.__record_views = {}
+
+        # Only needed while rows are being appended
+        self.__last_children = array('i', [NO_INDEX])
+        self.__open_rows = [ROOT_INDEX]
+
+    def __getstate__(self):
+        """Leaves out the kept views when pickling
+        :rtype: dict
+        """
+        state = self.__dict__.copy()
+        state['_ElementStore__record_views'] = {}
+        return state
+
+    def __len__(self):
+        """Returns the number of rows, including the root element
+        :rtype: int
+        """
+        return len(self.__levels)
+
+    def append(self, level, pointer, tag, value, crlf):
+        """Appends a line below the most recent line with a lower level and returns its index
+
+        The level must be at most one higher than the level of the previous line.
+        `value` may be a `str` or UTF-8 encoded `bytes`.
+
+        :type level: int
+        :type pointer: str
+        :type tag: str
+        :type value: str or bytes
+        :type crlf: str
+        :rtype: int
+        """
+        index = len(self.__levels)
+        parent = self.__open_rows[level]
+        del self.__open_rows[level + 1:]
+        self.__open_rows.append(index)
+
+        if not isinstance(value, bytes):
+            value = value.encode('utf-8')
+
+        self.__levels.append(level)
+        self.__tag_ids.append(self.__get_id(self.__tag_ids_by_tag, self.__tags, tag))
+        self.__pointer_ids.append(self.__get_id(self.__pointer_ids_by_pointer, self.__pointers, pointer))
+        self.__crlf_ids.append(self.__get_id(self.__crlf_ids_by_crlf, self.__crlfs, crlf))
+        self.__value_offsets.append(len(self.__text))
+        self.__value_lengths.append(len(value))
+        self.__text += value
+
+        self.__parents.append(parent)
+        self.__first_children.append(NO_INDEX)
+        self.__next_siblings.append(NO_INDEX)
+        self.__last_children.append(NO_INDEX)
+
+        previous_sibling = self.__last_children[parent]
+        if previous_sibling == NO_INDEX:
+            self.__first_children[parent] = index
+        else:
+            self.__next_siblings[previous_sibling] = index
+        self.__last_children[parent] = index
+
+        return index
+
+    def finish(self):
+        """Releases the bookkeeping only needed while appending; no rows can be appended afterwards"""
+        self.__text = bytes(self.__text)
+        self.__last_children = None
+        self.__open_rows = None
+        self.__tag_ids_by_tag = None
+        self.__pointer_ids_by_pointer = None
+        self.__crlf_ids_by_crlf = None
+
+    def get_last_index(self):
+        """Returns the index of the most recently appended row
+        :rtype: int
+        """
+        return len(self.__levels) - 1
+
+    def get_level(self, index):
+        """:rtype: int"""
+        return self.__levels[index]
+
+    def get_pointer(self, index):
+        """:rtype: str"""
+        return self.__pointers[self.__pointer_ids[index]]
+
+    def get_tag(self, index):
+        """:rtype: str"""
+        return self.__tags[self.__tag_ids[index]]
+
+    def get_value(self, index):
+        """:rtype: str"""
+        return self.get_encoded_value(index).decode('utf-8')
+
+    def get_encoded_value(self, index):
+        """:rtype: bytes"""
+        offset = self.__value_offsets[index]
+        return bytes(self.__text[offset:offset + self.__value_lengths[index]])
+
+    def get_crlf(self, index):
+        """:rtype: str"""
+        return self.__crlfs[self.__crlf_ids[index]]
+
+    def get_parent_index(self, index):
+        """:rtype: int"""
+        return self.__parents[index]
+
+    def get_child_indexes(self, index):
+        """:rtype: list of int"""
+        child_indexes = []
+        child = self.__first_children[index]
+        next_siblings = self.__next_siblings
+        while child != NO_INDEX:
+            child_indexes.append(child)
+            child = next_siblings[child]
+        return child_indexes
+
+    def get_element(self, index):
+        """Returns a read-only element view of a row
+        :type index: int
+        :rtype: Element
+        """
+        if self.__levels[index] > 0:
+            return _VIEW_CLASSES.get(self.get_tag(index), ElementView)(self, index)
+
+        view = self.__record_views.get(index)
+        if view is None:
+            if index == ROOT_INDEX:
+                view = RootElementView(self, index)
+            else:
+                view = _VIEW_CLASSES.get(self.get_tag(index), ElementView)(self, index)
+            self.__record_views[index] = view
+        return view
+
+    def get_root_element(self):
+        """Returns a view of the virtual root element
+        :rtype: RootElement
+        """
+        return self.get_element(ROOT_INDEX)
+
+    @staticmethod
+    def __get_id(ids, values, value):
+        """Returns the id of a value in a table of distinct values, adding it if necessary
+        :rtype: int
+        """
+        value_id = ids.get(value)
+        if value_id is None:
+            value_id = ids[value] = len(values)
+            values.append(value)
+        return value_id
+
+
+class _StoredElement(object):
+    """Read-only accessors shared by all element views of an `ElementStore`
+
+    Concrete views combine this with one of the regular element classes and add the
+    `_store` and `_index` slots. They inherit the slots of that class too, so that
+    `isinstance()` checks keep working; apart from the facts of an `IndividualElementView`
+    these stay unused.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, store, index):
+        """:type store: ElementStore
+        :type index: int
+        """
+        self._store = store
+        self._index = index
+
+    def get_store(self):
+        """Returns the store this element is a view of
+        :rtype: ElementStore
+        """
+        return self._store
+
+    def get_index(self):
+        """Returns the row of this element within its store
+        :rtype: int
+        """
+        return self._index
+
+    def get_level(self):
+        return self._store.get_level(self._index)
+
+    def get_pointer(self):
+        return self._store.get_pointer(self._index)
+
+    def get_tag(self):
+        return self._store.get_tag(self._index)
+
+    def get_value(self):
+        return self._store.get_value(self._index)
+
+    def _get_undecoded_value(self):
+        return self._store.get_encoded_value(self._index)
+
+    def get_crlf(self):
+        return self._store.get_crlf(self._index)
+
+    def get_child_elements(self):
+        store = self._store
+        return [store.get_element(child) for child in store.get_child_indexes(self._index)]
+
+    def get_child_elements_by_tag(self, tag):
+        store = self._store
+        return [store.get_element(child) for child in store.get_child_indexes(self._index) if store.get_tag(child) == tag]
+
+    def invalidate_tag_index(self):
+        pass
+
+    def get_parent_element(self):
+        parent = self._store.get_parent_index(self._index)
+        if parent == NO_INDEX:
+            return None
+        return self._store.get_element(parent)
+
+    def set_value(self, value):
+        raise ReadOnlyElementError("Elements of an ElementStore cannot be modified")
+
+    def set_multi_line_value(self, value):
+        raise ReadOnlyElementError("Elements of an ElementStore cannot be modified")
+
+    def new_child_element(self, tag, pointer="", value=""):
+        raise ReadOnlyElementError("Elements of an ElementStore cannot be modified")
+
+    def add_child_element(self, element):
+        raise ReadOnlyElementError("Elements of an ElementStore cannot be modified")
+
+    def remove_child_element(self, element):
+        raise ReadOnlyElementError("Elements of an ElementStore cannot be modified")
+
+    def set_parent_element(self, element):
+        raise ReadOnlyElementError("Elements of an ElementStore cannot be modified")
+
+    def __eq__(self, other):
+        return isinstance(other, _StoredElement) and self._store is other._store and self._index == other._index
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((id(self._store), self._index))
+
+
+class ElementView(_StoredElement, Element):
+    __slots__ = ('_store', '_index')
+
+
+class FamilyElementView(_StoredElement, FamilyElement):
+    __slots__ = ('_store', '_index')
+
+
+class FileElementView(_StoredElement, FileElement):
+    __slots__ = ('_store', '_index')
+
+
+class IndividualElementView(_StoredElement, IndividualElement):
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index):
+        _StoredElement.__init__(self, store, index)
+        self.invalidate_facts()
+
+
+class ObjectElementView(_StoredElement, ObjectElement):
+    __slots__ = ('_store', '_index')
+
+
+class RootElementView(_StoredElement, RootElement):
+    __slots__ = ('_store', '_index')
+
+
+_VIEW_CLASSES = {
+    gedcom.tags.GEDCOM_TAG_FAMILY: FamilyElementView,
+    gedcom.tags.GEDCOM_TAG_FILE: FileElementView,
+    gedcom.tags.GEDCOM_TAG_INDIVIDUAL: IndividualElementView,
+    gedcom.tags.GEDCOM_TAG_OBJECT: ObjectElementView,
+}
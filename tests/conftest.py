@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from gedcom.parser import Parser
+
+
+SAMPLE_GEDCOM = """0 HEAD
+1 CHAR UTF-8
+0 @I1@ INDI
+1 NAME John /Smith/
+1 SEX M
+1 BIRT
+2 DATE 1 JAN 1900
+2 PLAC London
+1 DEAT
+2 DATE ABT 1970
+1 FAMS @F1@
+0 @I2@ INDI
+1 NAME Mary /Jones/
+1 SEX F
+1 BIRT
+2 DATE 1902
+1 FAMS @F1@
+0 @I3@ INDI
+1 NAME Peter /Smith/
+1 SEX M
+1 BIRT
+2 DATE 5 MAR 1925
+1 FAMC @F1@
+0 @I4@ INDI
+1 NAME Anne /Smith/
+1 SEX F
+1 BIRT
+2 DATE 1928
+1 FAMC @F1@
+0 @F1@ FAM
+1 HUSB @I1@
+1 WIFE @I2@
+1 CHIL @I3@
+2 _FREL Natural
+2 _MREL Natural
+1 CHIL @I4@
+2 _FREL Adopted
+2 _MREL Natural
+1 MARR
+2 DATE 1924
+0 @N1@ NOTE A long note
+1 CONT second line
+1 CONC  continued
+0 TRLR
+"""
+
+# Lines a strict parse rejects, but a lenient parse accepts
+QUIRKY_GEDCOM = """0 HEAD
+1 CHAR UTF-8
+0 @I1@ INDI
+1 NAME John /Smith/
+1 NOTE line one
+continued text without level
+1 BIRT
+2 DATE 1 JAN 1900
+0 @I2@ INDI
+1 NAME Jane  /Doe/
+1 _UID  x
+1 NOTE ab
+0 TRLR
+"""
+
+
+@pytest.fixture
+def sample_file(tmp_path):
+    path = tmp_path / "sample.ged"
+    path.write_text(SAMPLE_GEDCOM)
+    return str(path)
+
+
+@pytest.fixture
+def quirky_file(tmp_path):
+    path = tmp_path / "quirky.ged"
+    path.write_text(QUIRKY_GEDCOM)
+    return str(path)
+
+
+# Three generations: George and Edith are the grandparents of the siblings Sam and Lucy, and of
+# their cousins Nora and Alan, who was adopted by Ruth and Carl
+PEDIGREE_GEDCOM = """0 HEAD
+1 CHAR UTF-8
+0 @I1@ INDI
+1 NAME George /Hill/
+1 SEX M
+1 FAMS @F1@
+0 @I2@ INDI
+1 NAME Edith /Hill/
+1 SEX F
+1 FAMS @F1@
+0 @I3@ INDI
+1 NAME Tom /Hill/
+1 SEX M
+1 FAMC @F1@
+1 FAMS @F2@
+0 @I4@ INDI
+1 NAME Ruth /Hill/
+1 SEX F
+1 FAMC @F1@
+1 FAMS @F3@
+0 @I5@ INDI
+1 NAME Jane /Reed/
+1 SEX F
+1 FAMS @F2@
+0 @I6@ INDI
+1 NAME Sam /Hill/
+1 SEX M
+1 FAMC @F2@
+0 @I7@ INDI
+1 NAME Lucy /Hill/
+1 SEX F
+1 FAMC @F2@
+0 @I8@ INDI
+1 NAME Carl /Webb/
+1 SEX M
+1 FAMS @F3@
+0 @I9@ INDI
+1 NAME Nora /Webb/
+1 SEX F
+1 FAMC @F3@
+0 @I10@ INDI
+1 NAME Alan /Webb/
+1 SEX M
+1 FAMC @F3@
+0 @F1@ FAM
+1 HUSB @I1@
+1 WIFE @I2@
+1 CHIL @I3@
+2 _FREL Natural
+2 _MREL Natural
+1 CHIL @I4@
+2 _FREL Natural
+2 _MREL Natural
+0 @F2@ FAM
+1 HUSB @I3@
+1 WIFE @I5@
+1 CHIL @I6@
+2 _FREL Natural
+2 _MREL Natural
+1 CHIL @I7@
+2 _FREL Natural
+2 _MREL Natural
+0 @F3@ FAM
+1 HUSB @I8@
+1 WIFE @I4@
+1 CHIL @I9@
+2 _FREL Natural
+2 _MREL Natural
+1 CHIL @I10@
+2 _FREL Adopted
+2 _MREL Adopted
+0 TRLR
+"""
+
+# Two individuals who are each other's father
+CYCLE_GEDCOM = """0 HEAD
+0 @I1@ INDI
+1 NAME Adam /Loop/
+1 SEX M
+1 FAMS @F1@
+1 FAMC @F2@
+0 @I2@ INDI
+1 NAME Abel /Loop/
+1 SEX M
+1 FAMS @F2@
+1 FAMC @F1@
+0 @F1@ FAM
+1 HUSB @I1@
+1 CHIL @I2@
+2 _FREL Natural
+0 @F2@ FAM
+1 HUSB @I2@
+1 CHIL @I1@
+2 _FREL Natural
+0 TRLR
+"""
+
+
+@pytest.fixture
+def pedigree(tmp_path):
+    path = tmp_path / "pedigree.ged"
+    path.write_text(PEDIGREE_GEDCOM)
+    parser = Parser()
+    parser.parse_file(str(path))
+    return parser
+
+
+@pytest.fixture
+def cycle(tmp_path):
+    path = tmp_path / "cycle.ged"
+    path.write_text(CYCLE_GEDCOM)
+    parser = Parser()
+    parser.parse_file(str(path))
+    return parser
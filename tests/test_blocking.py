@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from conftest import SAMPLE_GEDCOM
+from gedcom.blocking import BlockingIndex, get_blocking_key, get_surname_code, soundex
+from gedcom.criteria import Criteria
+from gedcom.parser import Parser
+
+
+@pytest.mark.parametrize("name, code", [
+    ("Robert", "R163"), ("Rupert", "R163"), ("Tymczak", "T522"), ("Pfister", "P236"),
+    ("Ashcraft", "A261"), ("Tiffany", "T150"), ("Lee", "L000"), ("O'Brien", "O165"), ("", ""),
+])
+def test_soundex(name, code):
+    assert soundex(name) == code
+
+
+def test_surname_codes():
+    assert get_surname_code("Smith") == get_surname_code("Smyth") == "S530"
+    assert get_surname_code("Smith 2") == "smith 2"
+    assert get_surname_code("  ") == ""
+
+
+def individuals(file_path):
+    parser = Parser()
+    parser.parse_file(file_path)
+    return parser.find_individuals(Criteria())
+
+
+def test_blocking_index_candidates(sample_file, tmp_path):
+    path = tmp_path / "changed.ged"
+    path.write_text(SAMPLE_GEDCOM.replace("Peter /Smith/", "Peter /Smyth/").replace("5 MAR 1925", "1955"))
+    index = BlockingIndex(individuals(sample_file))
+    changed = individuals(str(path))
+
+    assert len(index) == 4
+    assert get_blocking_key(changed[2]) == ("S530", "P")
+    assert index.get_candidates(changed[2]) == []
+    assert [individual.get_pointer() for individual in index.get_candidates(changed[2], None)] == ["@I3@"]
+    assert [individual.get_pointer() for individual in index.get_candidates(changed[0])] == ["@I1@"]
+
+
+def test_soundex_ignores_accents():
+    assert soundex("\u00d6stberg") == soundex("Ostberg") == "O231"
+    assert soundex("\u00c5ngstr\u00f6m") == soundex("Angstrom") == "A523"
+    assert soundex("O\u0308stberg") == "O231"
+    assert get_surname_code("\u00d6stberg") == get_surname_code("Ostberg")
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from gedcom.cache import SnapshotCache
+from gedcom.parser import Parser
+
+
+def values(parser):
+    return [(element.get_tag(), element.get_value()) for element in parser.get_element_list()]
+
+
+def snapshot_paths(cache):
+    return [os.path.join(cache.get_directory(), name) for name in os.listdir(cache.get_directory())]
+
+
+def test_snapshot_cache_reuses_snapshots(sample_file, tmp_path):
+    cache = SnapshotCache(str(tmp_path / "cache"))
+    first = Parser()
+    first.parse_file(sample_file, cache=cache)
+    assert cache.load(sample_file) is not None
+
+    second = Parser()
+    second.parse_file(sample_file, cache=cache)
+    assert values(second) == values(first)
+    assert second.get_element_dictionary()["@I3@"].get_name() == ("Peter", "Smith")
+
+
+def test_snapshot_cache_misses_changed_files(sample_file, tmp_path):
+    cache = SnapshotCache(str(tmp_path / "cache"))
+    Parser().parse_file(sample_file, cache=cache)
+
+    with open(sample_file, "a") as gedcom_file:
+        gedcom_file.write("0 @N2@ NOTE added\n")
+    assert cache.load(sample_file) is None
+
+    parser = Parser()
+    parser.parse_file(sample_file, cache=cache)
+    assert "@N2@" in parser.get_element_dictionary()
+
+
+def test_snapshot_cache_drops_undecodable_snapshots(sample_file, tmp_path):
+    cache = SnapshotCache(str(tmp_path / "cache"))
+    Parser().parse_file(sample_file, cache=cache)
+
+    path = snapshot_paths(cache)[0]
+    with open(path, "rb") as snapshot_file:
+        data = snapshot_file.read()
+    for broken in (data[:len(data) // 2], b"not a snapshot"):
+        with open(path, "wb") as snapshot_file:
+            snapshot_file.write(broken)
+        assert cache.load(sample_file) is None
+        assert not os.path.exists(path)
+
+
+def test_snapshot_cache_keeps_mmap_values_undecoded(tmp_path):
+    path = tmp_path / "invalid.ged"
+    path.write_bytes(b"0 HEAD\n0 @I1@ INDI\n1 NAME J\xf6rg /Smith/\n1 SEX M\n0 TRLR\n")
+    cache = SnapshotCache(str(tmp_path / "cache"))
+
+    for _ in range(2):
+        parser = Parser()
+        parser.parse_file(str(path), use_mmap=True, cache=cache)
+        name, sex = parser.get_element_dictionary()["@I1@"].get_child_elements()
+        assert sex.get_value() == "M"
+        with pytest.raises(UnicodeDecodeError):
+            name.get_value()
+    assert cache.load(str(path)) is not None
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from gedcom.criteria import Criteria, InvalidCriteriaError
+from gedcom.element.individual import IndividualElement
+from gedcom.parser import Parser
+
+
+@pytest.fixture
+def parser(sample_file):
+    parser = Parser()
+    parser.parse_file(sample_file)
+    return parser
+
+
+def pointers(elements):
+    return [element.get_pointer() for element in elements]
+
+
+CRITERIA = [
+    ("surname=Smith", ["@I1@", "@I3@", "@I4@"]),
+    ("surname=smith:name=^P", ["@I3@"]),
+    ("name=Mary", ["@I2@"]),
+    ("gender=F", ["@I2@", "@I4@"]),
+    ("birth=1925", ["@I3@"]),
+    ("birth_range=1900-1910", ["@I1@", "@I2@"]),
+    ("death_range=1960-1980", ["@I1@"]),
+    ("surname=Smith:birth_range=1920-1930", ["@I3@", "@I4@"]),
+    ("birth=19xx", []),
+    ("unknown=1", ["@I1@", "@I2@", "@I3@", "@I4@"]),
+]
+
+
+@pytest.mark.parametrize("criteria, expected", CRITERIA)
+def test_compiled_criteria_match_like_criteria_match(parser, criteria, expected):
+    individuals = parser.find_individuals(Criteria())
+    assert pointers(individual for individual in individuals if individual.criteria_match(criteria)) == expected
+    assert pointers(individual for individual in individuals if Criteria(criteria).matches(individual)) == expected
+    assert pointers(parser.find_individuals(criteria)) == expected
+
+
+def test_find_individuals_limit(parser):
+    assert pointers(parser.find_individuals("surname=Smith", limit=1)) == ["@I1@"]
+    assert parser.find_individuals("surname=Smith", limit=0) == []
+
+
+def test_invalid_criteria():
+    with pytest.raises(InvalidCriteriaError):
+        Criteria("surname")
+    assert Criteria.compile("surname=Smith") is Criteria.compile("surname=Smith")
+
+
+@pytest.mark.parametrize("criteria, expected", CRITERIA)
+def test_individual_index_matches_the_scan(parser, criteria, expected):
+    parser.enable_individual_index()
+    assert pointers(parser.find_individuals(criteria)) == expected
+
+
+def test_individual_index_candidates(parser):
+    index = parser.get_individual_index()
+    assert len(index) == 4
+    assert index.get_candidates(Criteria("surname=Smith:birth_range=1920-1930")) == [2, 3]
+    assert index.get_candidates(Criteria("gender=F")) is None
+
+
+def test_individual_index_follows_added_individuals(parser):
+    parser.enable_individual_index()
+    assert pointers(parser.find_individuals("surname=Brown")) == []
+
+    individual = IndividualElement(0, "@I9@", "INDI", "")
+    parser.get_root_element().add_child_element(individual)
+    individual.new_child_element("NAME", value="Paul /Brown/")
+    assert pointers(parser.find_individuals("surname=Brown")) == ["@I9@"]
+
+
+def test_individual_index_follows_changed_values(parser):
+    parser.enable_individual_index()
+    assert pointers(parser.find_individuals("surname=Brown")) == []
+
+    name = parser.get_element_dictionary()["@I3@"].get_child_elements_by_tag("NAME")[0]
+    name.set_value("Peter /Brown/")
+    assert pointers(parser.find_individuals("surname=Brown")) == ["@I3@"]
+    assert pointers(parser.find_individuals("surname=Smith")) == ["@I1@", "@I4@"]
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from gedcom.date import QUALIFIER_ABOUT, QUALIFIER_BEFORE, QUALIFIER_BETWEEN, parse_date
+from gedcom.parser import Parser
+
+
+@pytest.mark.parametrize("text, standardised, year, interval", [
+    ("1 JAN 1900", "1 JAN 1900", 1900, ((1900, 1, 1), (1900, 1, 1))),
+    ("5 March 1925", "5 MAR 1925", 1925, ((1925, 3, 5), (1925, 3, 5))),
+    ("JAN 1900", "JAN 1900", 1900, ((1900, 1, 1), (1900, 1, 31))),
+    ("abt. 1970", "ABT 1970", 1970, ((1970, 1, 1), (1970, 12, 31))),
+    ("BET 1900 AND 1910", "BET 1900 AND 1910", 1910, ((1900, 1, 1), (1910, 12, 31))),
+    ("FROM 1900 TO 1910", "FROM 1900 TO 1910", 1910, ((1900, 1, 1), (1910, 12, 31))),
+    ("BEF 1900", "BEF 1900", 1900, (None, (1900, 12, 31))),
+    ("AFT 1 MAR 1900", "AFT 1 MAR 1900", 1900, ((1900, 3, 1), None)),
+    ("INT 1900 (about then)", "INT 1900 (about then)", 1900, ((1900, 1, 1), (1900, 12, 31))),
+    ("sometime", "SOMETIME", -1, (None, None)),
+    ("", "", -1, (None, None)),
+])
+def test_parse_date(text, standardised, year, interval):
+    date = parse_date(text)
+    assert date.get_standardised() == standardised
+    assert date.get_year() == year
+    assert date.get_interval() == interval
+    assert date.is_known() == (year != -1)
+
+
+def test_qualifiers_and_calendars():
+    assert parse_date("ABT 1970").get_qualifier() == QUALIFIER_ABOUT
+    assert parse_date("ABT 1970").is_approximate()
+    assert parse_date("BEF 1900").get_qualifier() == QUALIFIER_BEFORE
+    assert parse_date("BET 1900 AND 1910").get_second_date().get_year() == 1910
+    assert parse_date("BET 1900 AND 1910").get_qualifier() == QUALIFIER_BETWEEN
+
+    julian = parse_date("@#DJULIAN@ 1 JAN 1700/01").get_first_date()
+    assert julian.get_calendar() == "@#DJULIAN@"
+    assert julian.get_year() == 1700
+
+
+def test_overlaps_and_sort_keys():
+    assert parse_date("BEF 1900").overlaps(parse_date("1899"))
+    assert not parse_date("BEF 1900").overlaps(parse_date("1901"))
+    assert not parse_date("sometime").overlaps(parse_date("1900"))
+
+    dates = [parse_date(text) for text in ("1910", "sometime", "BEF 1900", "1 JAN 1900")]
+    assert [date.get_standardised() for date in sorted(dates, key=lambda date: date.get_sort_key())] == \
+        ["BEF 1900", "1 JAN 1900", "1910", "SOMETIME"]
+
+
+def test_parsed_dates_are_shared():
+    assert parse_date("1 JAN 1900") is parse_date("1 JAN 1900")
+    assert parse_date("1 JAN 1900") == parse_date("1 jan. 1900")
+
+
+def test_individual_years_use_the_date_parser(sample_file):
+    parser = Parser()
+    parser.parse_file(sample_file)
+    individual = parser.get_element_dictionary()["@I1@"]
+    assert individual.get_birth_year() == 1900
+    assert individual.get_death_year() == 1970
+
+
+@pytest.mark.parametrize("text, birth_year", [("\u00b2 JAN 1900", 1900), ("1 JAN 190\u00b2", -1), ("\u00b2", -1)])
+def test_digits_that_are_not_decimal_are_not_dates(text, birth_year, tmp_path):
+    date = parse_date(text)
+    assert not date.is_known()
+    assert date.get_year() == -1
+
+    path = tmp_path / "superscript.ged"
+    path.write_text("0 HEAD\n0 @I1@ INDI\n1 BIRT\n2 DATE %s\n0 TRLR\n" % text, encoding="utf-8")
+    parser = Parser()
+    parser.parse_file(str(path))
+    # Values that are not dates fall back to their last word as the year
+    assert parser.get_element_dictionary()["@I1@"].get_birth_year() == birth_year
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from gedcom.element.element import Element
+from gedcom.parser import Parser
+
+
+def test_elements_have_no_instance_dictionary():
+    element = Element(1, "", "NOTE", "text")
+    with pytest.raises(AttributeError):
+        element.unknown_attribute = True
+
+
+def test_leaf_elements_return_a_list():
+    element = Element(1, "", "NOTE", "text")
+    children = element.get_child_elements()
+    children.append(Element(2, "", "CONT", "more"))
+    assert element.get_child_elements() == []
+
+
+def test_children_can_be_added_to_leaf_elements():
+    element = Element(1, "", "NOTE", "text")
+    child = element.new_child_element("CONT", value="more")
+    assert element.get_child_elements() == [child]
+    assert child.get_parent_element() is element
+
+
+def test_removing_from_a_leaf_raises_value_error():
+    element = Element(1, "", "NOTE", "text")
+    with pytest.raises(ValueError):
+        element.remove_child_element(Element(2, "", "CONT", "more"))
+
+
+def parse(file_path):
+    parser = Parser()
+    parser.parse_file(file_path)
+    return parser
+
+
+def test_tag_index_follows_children(sample_file):
+    family = parse(sample_file).get_element_dictionary()["@F1@"]
+    for number in range(10):
+        family.new_child_element("NOTE", value=str(number))
+
+    children = family.get_child_elements_by_tag("CHIL")
+    assert len(children) == 2
+    children.pop()
+    assert len(family.get_child_elements_by_tag("CHIL")) == 2
+
+    family.remove_child_element(family.get_child_elements_by_tag("CHIL")[0])
+    assert len(family.get_child_elements_by_tag("CHIL")) == 1
+    assert len(family.get_child_elements_by_tag("NOTE")) == 10
+    assert family.get_child_elements_by_tag("SOUR") == []
+
+
+def test_individual_facts_follow_changes(sample_file):
+    individual = parse(sample_file).get_element_dictionary()["@I3@"]
+    assert individual.get_name() == ("Peter", "Smith")
+    assert individual.get_birth_year() == 1925
+
+    individual.get_child_elements_by_tag("NAME")[0].set_value("Pete /Smyth/")
+    birth = individual.get_child_elements_by_tag("BIRT")[0]
+    birth.remove_child_element(birth.get_child_elements_by_tag("DATE")[0])
+    assert individual.get_name() == ("Pete", "Smyth")
+    assert individual.get_birth_year() == -1
+
+    birth.new_child_element("DATE", value="1926")
+    assert individual.get_birth_year() == 1926
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+from gedcom.element.individual import IndividualElement
+from gedcom.parser import Parser
+
+
+def parse(file_path):
+    parser = Parser()
+    parser.parse_file(file_path)
+    return parser
+
+
+def cached_state(parser):
+    return (
+        list(parser.get_element_list()),
+        dict(parser.get_element_dictionary()),
+        sorted((pointer, record.get_pointer(), tag)
+               for pointer in ("@I1@", "@I3@", "@I9@", "@F1@")
+               for record, tag in parser.get_referrers(pointer)),
+    )
+
+
+def rebuilt_state(parser):
+    parser.invalidate_cache()
+    return cached_state(parser)
+
+
+def test_caches_follow_added_records(sample_file):
+    parser = parse(sample_file)
+    cached_state(parser)
+
+    individual = IndividualElement(0, "@I9@", "INDI", "")
+    parser.get_root_element().add_child_element(individual)
+    individual.new_child_element("NAME", value="Paul /Smith/")
+    individual.new_child_element("FAMC", value="@F1@")
+    parser.get_element_dictionary()["@F1@"].new_child_element("CHIL", value="@I9@")
+
+    state = cached_state(parser)
+    assert state[1]["@I9@"] is individual
+    assert ("@I9@", "@F1@", "CHIL") in state[2]
+    assert state == rebuilt_state(parser)
+
+
+def test_caches_follow_removed_elements(sample_file):
+    parser = parse(sample_file)
+    cached_state(parser)
+
+    family = parser.get_element_dictionary()["@F1@"]
+    child = [child for child in family.get_child_elements() if child.get_tag() == "CHIL"][0]
+    family.remove_child_element(child)
+    parser.get_root_element().remove_child_element(parser.get_element_dictionary()["@I1@"])
+
+    state = cached_state(parser)
+    assert "@I1@" not in state[1]
+    assert ("@I3@", "@F1@", "CHIL") not in state[2]
+    assert child not in state[0]
+    assert state == rebuilt_state(parser)
+
+
+def test_element_list_follows_inserted_children(sample_file):
+    parser = parse(sample_file)
+    cached_state(parser)
+
+    individual = parser.get_element_dictionary()["@I2@"]
+    note = individual.new_child_element("NOTE", value="first")
+    note.new_child_element("CONT", value="second")
+
+    element_list = parser.get_element_list()
+    assert element_list.index(note) + 1 == element_list.index(note.get_child_elements()[0])
+    assert element_list.index(note) < element_list.index(parser.get_element_dictionary()["@I3@"])
+    assert cached_state(parser) == rebuilt_state(parser)
+
+
+def test_referrers_of_a_record(sample_file):
+    parser = parse(sample_file)
+
+    assert sorted((record.get_pointer(), tag) for record, tag in parser.get_referrers("@F1@")) == \
+        [("@I1@", "FAMS"), ("@I2@", "FAMS"), ("@I3@", "FAMC"), ("@I4@", "FAMC")]
+    assert [record.get_pointer() for record, _ in parser.get_referrers("@F1@", "FAMC")] == ["@I3@", "@I4@"]
+    assert parser.get_referrers("@N1@") == []
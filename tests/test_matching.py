@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+import concurrent.futures
+import itertools
+import random
+
+import pytest
+
+import gedcom.matching
+from conftest import SAMPLE_GEDCOM
+from gedcom.criteria import Criteria
+from gedcom.matching import ComparisonFrontier, PairScorer, _assign, match_individuals, score_individuals
+from gedcom.parser import Parser
+
+
+def individuals(file_path):
+    parser = Parser()
+    parser.parse_file(file_path)
+    return parser.find_individuals(Criteria())
+
+
+def pointers(pairs):
+    return [(individual_1.get_pointer(), individual_2.get_pointer()) for individual_1, individual_2, _ in pairs]
+
+
+@pytest.fixture
+def changed_file(tmp_path):
+    path = tmp_path / "changed.ged"
+    path.write_text(SAMPLE_GEDCOM.replace("Peter /Smith/", "Pete /Smith/").replace("2 DATE 1928", "2 DATE 1929"))
+    return str(path)
+
+
+def test_scores_and_findings(sample_file, changed_file):
+    individuals_1 = individuals(sample_file)
+    individuals_2 = individuals(changed_file)
+
+    findings = []
+    assert score_individuals(individuals_1[0], individuals_2[0], findings) == pytest.approx(1)
+    assert findings == []
+
+    assert score_individuals(individuals_1[2], individuals_2[2], findings) == pytest.approx(0.9)
+    assert findings == [' - FULL NAME MIS-MATCH, FIRST INITIAL OK : Peter vs Pete\n']
+
+    assert score_individuals(individuals_1[0], individuals_2[1]) == 0
+
+
+@pytest.mark.parametrize("refine", [False, True])
+def test_match_individuals_one_to_one(sample_file, changed_file, refine):
+    matches = match_individuals(individuals(sample_file), individuals(changed_file), refine=refine)
+
+    assert pointers(matches) == [("@I1@", "@I1@"), ("@I2@", "@I2@"), ("@I3@", "@I3@"), ("@I4@", "@I4@")]
+    assert [score for _, _, score in matches] == pytest.approx([1, 1, 0.9, 0.7])
+
+
+def test_assign_beats_greedy_matching():
+    pairs = [(0, 0, 0.9), (0, 1, 0.8), (1, 0, 0.8)]
+    assert sorted(_assign(pairs, [0, 1], [0, 1])) == [(0, 1, 0.8), (1, 0, 0.8)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_assign_finds_the_best_total(seed):
+    generator = random.Random(seed)
+    positions_1 = list(range(generator.randint(1, 5)))
+    positions_2 = list(range(generator.randint(1, 5)))
+    pairs = [
+        (position_1, position_2, round(generator.uniform(0.4, 1), 2))
+        for position_1 in positions_1 for position_2 in positions_2 if generator.random() < 0.7
+    ]
+    scores = dict(((pair[0], pair[1]), pair[2]) for pair in pairs)
+
+    best = 0
+    for size in range(min(len(positions_1), len(positions_2)) + 1):
+        for chosen_1 in itertools.combinations(positions_1, size):
+            for chosen_2 in itertools.permutations(positions_2, size):
+                if all(pair in scores for pair in zip(chosen_1, chosen_2)):
+                    best = max(best, sum(scores[pair] for pair in zip(chosen_1, chosen_2)))
+
+    assigned = _assign(pairs, positions_1, positions_2)
+    assert len(set(pair[0] for pair in assigned)) == len(assigned)
+    assert len(set(pair[1] for pair in assigned)) == len(assigned)
+    assert sum(pair[2] for pair in assigned) == pytest.approx(best)
+
+
+@pytest.mark.parametrize("breadth_first, expected", [
+    (False, ["@I2@", "@I4@", "@I1@"]),
+    (True, ["@I1@", "@I2@", "@I4@"]),
+])
+def test_frontier_orders(sample_file, breadth_first, expected):
+    parent_1, parent_2, root, child = individuals(sample_file)
+    frontier = ComparisonFrontier(breadth_first=breadth_first)
+    frontier.add(root, root, 0)
+    frontier.pop()
+    assert frontier.add(parent_1, parent_1, 1)
+    assert frontier.add(parent_2, parent_2, 1)
+    assert not frontier.add(parent_1, parent_1, 1)
+    if breadth_first:
+        assert [pair[0].get_pointer() for pair in frontier.get_level()] == ["@I1@", "@I2@"]
+
+    order = [frontier.pop()[0].get_pointer()]
+    frontier.add(child, child, 2)
+    while not frontier.is_done():
+        order.append(frontier.pop()[0].get_pointer())
+    assert order == expected
+
+
+def test_frontier_max_separation(sample_file):
+    parent_1, parent_2, root, child = individuals(sample_file)
+    frontier = ComparisonFrontier(max_separation=1)
+    assert frontier.add(parent_1, parent_1, 1)
+    assert not frontier.add(child, child, 2)
+    assert frontier.get_checked_count() == 0
+
+
+def test_best_first_frontier(sample_file):
+    parent_1, parent_2, root, child = individuals(sample_file)
+    frontier = ComparisonFrontier(best_first=True)
+    frontier.add(parent_1, parent_1, 1, 0.6)
+    frontier.add(parent_2, parent_2, 1, 0.9)
+    frontier.add(child, child, 2, 0.7)
+
+    assert [frontier.pop()[0].get_pointer() for _ in range(len(frontier))] == ["@I2@", "@I4@", "@I1@"]
+    with pytest.raises(ValueError):
+        ComparisonFrontier(best_first=True, breadth_first=True)
+
+
+def test_frontier_budget_and_pruning(sample_file):
+    individuals_1 = individuals(sample_file)
+    frontier = ComparisonFrontier(min_confidence=0.5, max_pairs=1)
+    assert frontier.add(individuals_1[0], individuals_1[0], 0)
+    assert not frontier.add(individuals_1[0], individuals_1[1], 0)
+    assert frontier.add(individuals_1[1], individuals_1[1], 0)
+    frontier.pop()
+    assert frontier.is_done()
+    assert frontier.is_over_budget()
+    assert frontier.get_pruned_count() == 1
+    assert len(frontier) == 1
+
+
+def test_match_individuals_in_parallel(sample_file, changed_file, monkeypatch):
+    monkeypatch.setattr(gedcom.matching, "MIN_PARALLEL_PAIRS", 1)
+    individuals_1 = individuals(sample_file)
+    individuals_2 = individuals(changed_file)
+
+    assert pointers(match_individuals(individuals_1, individuals_2, workers=2)) == \
+        pointers(match_individuals(individuals_1, individuals_2))
+
+
+def test_pair_scorer_matches_serial_scores(sample_file, changed_file, monkeypatch):
+    monkeypatch.setattr(gedcom.matching, "MIN_PARALLEL_PAIRS", 1)
+    individuals_1 = individuals(sample_file)
+    individuals_2 = individuals(changed_file)
+    pairs = list(itertools.product(individuals_1, individuals_2))
+
+    with PairScorer(individuals_1, individuals_2, workers=2, batch_size=3) as scorer:
+        scorer.prefetch(pairs)
+        for individual_1, individual_2 in pairs:
+            assert scorer.is_prefetched(individual_1, individual_2)
+            findings_1 = []
+            findings_2 = []
+            assert scorer.score(individual_1, individual_2, findings_1) == \
+                score_individuals(individual_1, individual_2, findings_2)
+            assert findings_1 == findings_2
+
+
+def test_pair_scorer_scores_small_batches_serially(sample_file, changed_file):
+    individuals_1 = individuals(sample_file)
+    individuals_2 = individuals(changed_file)
+
+    with PairScorer(individuals_1, individuals_2, workers=2) as scorer:
+        scorer.prefetch([(individuals_1[2], individuals_2[2])])
+        assert scorer.is_prefetched(individuals_1[2], individuals_2[2])
+        assert scorer.score(individuals_1[2], individuals_2[2]) == pytest.approx(0.9)
+
+
+def test_match_individuals_with_a_shared_scorer(sample_file, changed_file, monkeypatch):
+    monkeypatch.setattr(gedcom.matching, "MIN_PARALLEL_PAIRS", 1)
+    pools = []
+
+    class CountedPool(concurrent.futures.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(self)
+            super(CountedPool, self).__init__(*args, **kwargs)
+
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", CountedPool)
+    individuals_1 = individuals(sample_file)
+    individuals_2 = individuals(changed_file)
+
+    with PairScorer(individuals_1, individuals_2, workers=2) as scorer:
+        matches = match_individuals(individuals_1, individuals_2, scorer=scorer)
+        scorer.prefetch([(individual_1, individual_2) for individual_1, individual_2, _ in matches])
+        assert all(scorer.is_prefetched(individual_1, individual_2) for individual_1, individual_2, _ in matches)
+    assert len(pools) == 1
+    assert pointers(matches) == pointers(match_individuals(individuals_1, individuals_2))
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import zlib
+
+import pytest
+
+from gedcom.index import INDEX_VERSION, RecordIndex, StaleIndexError, get_index_path
+from gedcom.parser import BACKEND_ARRAYS, GedcomFormatViolationError, Parser, TOKENIZER_FAST, TOKENIZER_REGEX
+
+
+def parse(file_path, **options):
+    parser = Parser()
+    parser.parse_file(file_path, **options)
+    return parser
+
+
+def dump_element(element):
+    lines = [(element.get_level(), element.get_pointer(), element.get_tag(), element.get_value(), element.get_crlf())]
+    for child in element.get_child_elements():
+        lines.extend(dump_element(child))
+    return lines
+
+
+def dump(parser):
+    return [line for record in parser.get_root_child_elements() for line in dump_element(record)]
+
+
+def pointers(elements):
+    return [element.get_pointer() for element in elements]
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_tokenizers_build_the_same_tree(sample_file, use_mmap):
+    regex_tree = dump(parse(sample_file, tokenizer=TOKENIZER_REGEX))
+    assert dump(parse(sample_file, tokenizer=TOKENIZER_FAST, use_mmap=use_mmap)) == regex_tree
+    assert (1, "", "CONC", " continued") in [line[:4] for line in regex_tree]
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_tokenizers_agree_on_lenient_files(quirky_file, use_mmap):
+    regex_tree = dump(parse(quirky_file, strict=False, tokenizer=TOKENIZER_REGEX, use_mmap=use_mmap))
+    assert dump(parse(quirky_file, strict=False, tokenizer=TOKENIZER_FAST, use_mmap=use_mmap)) == regex_tree
+
+
+def test_strict_parsing_rejects_lines_without_level(quirky_file):
+    with pytest.raises(Exception):
+        parse(quirky_file)
+
+
+def test_iter_records_yields_the_parsed_records(sample_file):
+    records = list(Parser().iter_records(sample_file))
+
+    assert [dump_element(record) for record in records] == \
+        [dump_element(record) for record in parse(sample_file).get_root_child_elements()]
+    assert all(record.get_parent_element() is None for record in records)
+
+
+def test_mmap_decodes_values_on_access(sample_file):
+    parser = parse(sample_file, use_mmap=True)
+    individual = parser.get_element_dictionary()["@I1@"]
+    assert individual.get_name() == ("John", "Smith")
+    assert individual.get_birth_data() == ("1 JAN 1900", "London", [])
+
+
+def test_mmap_reports_invalid_utf8_on_access(tmp_path):
+    path = tmp_path / "invalid.ged"
+    path.write_bytes(b"0 HEAD\n0 @I1@ INDI\n1 NAME J\xf6rg /Smith/\n0 TRLR\n")
+    name = parse(str(path), use_mmap=True).get_element_dictionary()["@I1@"].get_child_elements()[0]
+    with pytest.raises(UnicodeDecodeError):
+        name.get_value()
+
+
+@pytest.mark.parametrize("options", [{"workers": 2}, {"backend": BACKEND_ARRAYS}])
+def test_other_parse_modes_build_the_same_tree(sample_file, options):
+    assert dump(parse(sample_file, **options)) == dump(parse(sample_file))
+
+
+def test_workers_resolve_records_across_chunks(sample_file):
+    parser = parse(sample_file, workers=2)
+    elements = parser.get_element_dictionary()
+
+    assert sorted(elements) == ["@F1@", "@I1@", "@I2@", "@I3@", "@I4@", "@N1@"]
+    assert all(record.get_parent_element() is parser.get_root_element()
+               for record in parser.get_root_child_elements())
+    assert pointers(parser.get_family_members(elements["@F1@"])) == ["@I1@", "@I2@", "@I3@", "@I4@"]
+
+
+def test_lazy_mode_parses_records_on_lookup(sample_file):
+    eager = parse(sample_file)
+    lazy = parse(sample_file, lazy=True)
+
+    for pointer in ("@I3@", "@F1@", "@N1@"):
+        assert dump_element(lazy.get_element_dictionary()[pointer]) == \
+            dump_element(eager.get_element_dictionary()[pointer])
+    assert lazy._Parser__record_index is not None
+    assert "@I9@" not in lazy.get_element_dictionary()
+
+    assert dump(lazy) == dump(eager)
+    assert lazy._Parser__record_index is None
+
+
+def test_lazy_mode_reports_errors_when_parsing_the_record(quirky_file):
+    parser = parse(quirky_file, lazy=True)
+    assert parser.get_element_dictionary()["@I2@"].get_name() == ("Jane", "Doe")
+    with pytest.raises(Exception):
+        parser.get_element_dictionary()["@I1@"]
+
+
+def test_sidecar_index_is_saved_and_reused(sample_file):
+    lazy = parse(sample_file, lazy=True, sidecar_index=True)
+    index_path = get_index_path(sample_file)
+    assert os.path.exists(index_path)
+
+    record_index = RecordIndex.load(index_path, sample_file)
+    assert record_index.get_pointers() == ["@I1@", "@I2@", "@I3@", "@I4@", "@F1@", "@N1@"]
+    assert dump(parse(sample_file, lazy=True, sidecar_index=True)) == dump(lazy)
+
+
+def test_sidecar_index_of_changed_file_is_not_loaded(sample_file):
+    parse(sample_file, lazy=True, sidecar_index=True)
+    with open(sample_file, "a") as gedcom_file:
+        gedcom_file.write("0 @N2@ NOTE added\n")
+
+    assert RecordIndex.load(get_index_path(sample_file), sample_file) is None
+    assert "@N2@" in parse(sample_file, lazy=True, sidecar_index=True).get_element_dictionary()
+
+
+def test_edit_keeping_size_and_time_raises_stale_index_error(sample_file):
+    parse(sample_file, lazy=True, sidecar_index=True)
+    stat = os.stat(sample_file)
+    with open(sample_file) as gedcom_file:
+        content = gedcom_file.read()
+    with open(sample_file, "w") as gedcom_file:
+        gedcom_file.write(content.replace("Peter /Smith/", "Piotr /Smith/"))
+    os.utime(sample_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    lazy = parse(sample_file, lazy=True, sidecar_index=True)
+    assert lazy.get_element_dictionary()["@I1@"].get_name() == ("John", "Smith")
+    with pytest.raises(StaleIndexError):
+        lazy.get_element_dictionary()["@I3@"]
+
+
+def test_sidecar_index_needs_lazy_mode(sample_file):
+    with pytest.raises(ValueError):
+        parse(sample_file, sidecar_index=True)
+
+
+def test_lazy_natural_parents_do_not_parse_the_whole_file(sample_file):
+    lazy = parse(sample_file, lazy=True)
+    elements = lazy.get_element_dictionary()
+
+    assert pointers(lazy.get_parents(elements["@I3@"], "NAT")) == ["@I1@", "@I2@"]
+    assert pointers(lazy.get_parents(elements["@I4@"], "NAT")) == ["@I2@"]
+    assert lazy._Parser__record_index is not None
+    assert "@N1@" not in pointers(lazy._Parser__lazy_records.values())
+
+
+def test_natural_parents_match_in_both_modes(sample_file):
+    eager = parse(sample_file)
+    elements = eager.get_element_dictionary()
+    assert pointers(eager.get_parents(elements["@I3@"], "NAT")) == ["@I1@", "@I2@"]
+    assert pointers(eager.get_parents(elements["@I4@"], "NAT")) == ["@I2@"]
+    assert pointers(eager.get_parents(elements["@I4@"])) == ["@I1@", "@I2@"]
+
+
+@pytest.mark.parametrize("tokenizer", [TOKENIZER_FAST, TOKENIZER_REGEX])
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_workers_tokenize_lenient_files_like_a_single_process(quirky_file, tokenizer, use_mmap):
+    options = {"strict": False, "tokenizer": tokenizer, "use_mmap": use_mmap}
+    assert dump(parse(quirky_file, workers=2, **options)) == dump(parse(quirky_file, **options))
+
+
+def test_workers_report_level_errors_at_the_file_line(tmp_path):
+    path = tmp_path / "levels.ged"
+    path.write_text("0 HEAD\n1 NOTE a long enough header note\n0 @I1@ INDI\n1 NAME John /Smith/\n"
+                    "0 @I2@ INDI\n2 NAME Jane /Doe/\n0 TRLR\n")
+    with pytest.raises(GedcomFormatViolationError, match="Line 6 "):
+        parse(str(path), workers=2)
+
+
+@pytest.mark.parametrize("data", [
+    b"not an index",
+    zlib.compress(pickle.dumps({"version": INDEX_VERSION})),
+    zlib.compress(pickle.dumps({"version": INDEX_VERSION + 1})),
+    zlib.compress(pickle.dumps(["not", "a", "dict"])),
+])
+def test_broken_sidecar_index_is_removed_and_rebuilt(sample_file, data):
+    index_path = get_index_path(sample_file)
+    with open(index_path, "wb") as index_file:
+        index_file.write(data)
+
+    assert RecordIndex.load(index_path, sample_file) is None
+    assert not os.path.exists(index_path)
+    assert "@I3@" in parse(sample_file, lazy=True, sidecar_index=True).get_element_dictionary()
+    assert RecordIndex.load(index_path, sample_file) is not None
+
+
+def test_sidecar_index_that_cannot_be_saved_is_skipped(sample_file, monkeypatch):
+    def save(self, index_path, file_path):
+        raise PermissionError(index_path)
+
+    monkeypatch.setattr(RecordIndex, "save", save)
+    lazy = parse(sample_file, lazy=True, sidecar_index=True)
+    assert lazy.get_element_dictionary()["@I3@"].get_name() == ("Peter", "Smith")
+    assert not os.path.exists(get_index_path(sample_file))
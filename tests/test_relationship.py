@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+
+def pointers(elements):
+    return [element.get_pointer() for element in elements]
+
+
+def test_graph_links_parents_children_and_spouses(pedigree):
+    elements = pedigree.get_element_dictionary()
+    graph = pedigree.get_relationship_graph()
+
+    assert len(graph) == 10
+    assert graph.get_individual(graph.get_id(elements["@I6@"])) is elements["@I6@"]
+    assert pointers(graph.get_parents(elements["@I6@"])) == ["@I3@", "@I5@"]
+    assert pointers(graph.get_parents(elements["@I10@"])) == ["@I8@", "@I4@"]
+    assert pointers(graph.get_parents(elements["@I10@"], "NAT")) == []
+    assert pointers(graph.get_children(elements["@I4@"])) == ["@I9@", "@I10@"]
+    assert pointers(graph.get_spouses(elements["@I4@"])) == ["@I8@"]
+
+
+def test_graph_answers_like_the_family_records(pedigree):
+    elements = pedigree.get_element_dictionary()
+    assert pointers(pedigree.get_parents(elements["@I9@"], "NAT")) == ["@I8@", "@I4@"]
+    assert pointers(pedigree.get_parents(elements["@I10@"])) == ["@I8@", "@I4@"]
+    assert pointers(pedigree.get_parents(elements["@I1@"])) == []
+
+
+def test_graph_is_rebuilt_after_family_changes(pedigree):
+    elements = pedigree.get_element_dictionary()
+    graph = pedigree.get_relationship_graph()
+
+    family = elements["@F3@"]
+    family.remove_child_element([child for child in family.get_child_elements() if child.get_tag() == "CHIL"][1])
+    assert pedigree.get_relationship_graph() is not graph
+    assert pointers(pedigree.get_relationship_graph().get_children(elements["@I4@"])) == ["@I9@"]
+
+
+def test_ancestors_with_generations(pedigree):
+    elements = pedigree.get_element_dictionary()
+
+    ancestors = pedigree.get_ancestors(elements["@I6@"], with_generations=True)
+    assert [(ancestor.get_pointer(), generation) for ancestor, generation in ancestors] == \
+        [("@I3@", 1), ("@I5@", 1), ("@I1@", 2), ("@I2@", 2)]
+    assert pointers(pedigree.get_ancestors(elements["@I6@"], max_generations=1)) == ["@I3@", "@I5@"]
+    assert pointers(pedigree.get_ancestors(elements["@I10@"])) == ["@I8@", "@I4@", "@I1@", "@I2@"]
+    assert pedigree.get_ancestors(elements["@I10@"], "NAT") == []
+
+
+def test_ancestor_sets(pedigree):
+    elements = pedigree.get_element_dictionary()
+
+    ancestor_sets = pedigree.get_ancestor_sets([elements["@I6@"], elements["@I9@"]])
+    assert [dict((ancestor.get_pointer(), generation) for ancestor, generation in ancestor_set.items())
+            for ancestor_set in ancestor_sets] == [
+        {"@I3@": 1, "@I5@": 1, "@I1@": 2, "@I2@": 2},
+        {"@I8@": 1, "@I4@": 1, "@I1@": 2, "@I2@": 2},
+    ]
+
+
+def test_ancestors_of_a_cycle(cycle):
+    elements = cycle.get_element_dictionary()
+    assert pointers(cycle.get_ancestors(elements["@I1@"])) == ["@I2@"]
+
+    graph = cycle.get_relationship_graph()
+    generations = graph.get_ancestor_generations(graph.get_id(elements["@I1@"]))
+    assert generations == {graph.get_id(elements["@I2@"]): 1}
+
+
+@pytest.mark.parametrize("individual, relative, label, path", [
+    ("@I6@", "@I9@", "1st cousin", ["@I6@", "@I3@", "@I1@", "@I4@", "@I9@"]),
+    ("@I6@", "@I1@", "grandfather", ["@I6@", "@I3@", "@I1@"]),
+    ("@I1@", "@I6@", "grandson", ["@I1@", "@I3@", "@I6@"]),
+    ("@I6@", "@I4@", "aunt", ["@I6@", "@I3@", "@I1@", "@I4@"]),
+    ("@I6@", "@I5@", "mother", ["@I6@", "@I5@"]),
+    ("@I6@", "@I8@", "husband of aunt", ["@I6@", "@I3@", "@I1@", "@I4@", "@I8@"]),
+])
+def test_relationship_labels(pedigree, individual, relative, label, path):
+    elements = pedigree.get_element_dictionary()
+    relationship = pedigree.get_relationship(elements[individual], elements[relative])
+    assert relationship.get_label() == label
+    assert pointers(relationship.get_path()) == path
+    assert relationship.get_length() == len(path) - 1
+
+
+def test_relationship_options(pedigree):
+    elements = pedigree.get_element_dictionary()
+
+    relationship = pedigree.get_relationship(elements["@I6@"], elements["@I9@"])
+    assert relationship.get_steps() == ["PARENT", "PARENT", "CHILD", "CHILD"]
+    assert relationship.get_common_ancestor() is elements["@I1@"]
+    assert pedigree.get_relationship(elements["@I6@"], elements["@I9@"], max_length=3) is None
+    assert pedigree.get_relationship(elements["@I6@"], elements["@I10@"]).get_label() == "1st cousin"
+    assert pedigree.get_relationship(elements["@I6@"], elements["@I10@"], natural_only=True) is None
+    relationship = pedigree.get_relationship(elements["@I6@"], elements["@I8@"], include_spouses=False)
+    assert "SPOUSE" not in relationship.get_steps()
+
+
+def test_path_ids_and_path_to_ancestor(pedigree):
+    elements = pedigree.get_element_dictionary()
+    graph = pedigree.get_relationship_graph()
+
+    ids, steps = graph.find_path_ids(graph.get_id(elements["@I6@"]), graph.get_id(elements["@I9@"]))
+    assert pointers(graph.get_individual(individual_id) for individual_id in ids) == \
+        ["@I6@", "@I3@", "@I1@", "@I4@", "@I9@"]
+    assert steps == ["PARENT", "PARENT", "CHILD", "CHILD"]
+
+    assert pointers(pedigree.find_path_to_ancestor(elements["@I6@"], elements["@I1@"])) == ["@I6@", "@I3@", "@I1@"]
+    assert pedigree.find_path_to_ancestor(elements["@I1@"], elements["@I6@"]) is None
+
+
+def test_relationship_in_a_cycle(cycle):
+    elements = cycle.get_element_dictionary()
+    assert pointers(cycle.get_relationship(elements["@I1@"], elements["@I2@"]).get_path()) == ["@I1@", "@I2@"]
+
+
+def test_kinship_index(pedigree):
+    elements = pedigree.get_element_dictionary()
+    kinship_index = pedigree.get_kinship_index()
+    kinship_index.precompute()
+
+    ancestors, generations_up, generations_down, label = kinship_index.get_kinship(elements["@I6@"], elements["@I9@"])
+    assert (pointers(ancestors), generations_up, generations_down, label) == (["@I1@", "@I2@"], 2, 2, "1st cousin")
+    ancestors, generations_up, generations_down, label = kinship_index.get_kinship(elements["@I6@"], elements["@I7@"])
+    assert (pointers(ancestors), generations_up, generations_down, label) == (["@I3@", "@I5@"], 1, 1, "sister")
+    assert kinship_index.get_kinship(elements["@I6@"], elements["@I8@"]) is None
+
+    assert pedigree.get_kinship_index("NAT").get_kinship(elements["@I6@"], elements["@I10@"]) is None
+    assert pedigree.get_kinship_index() is kinship_index
+
+
+def test_kinship_index_matches_relationship_search(pedigree):
+    elements = pedigree.get_element_dictionary()
+    kinship_index = pedigree.get_kinship_index()
+    individuals = [elements["@I%d@" % number] for number in range(1, 11)]
+
+    for individual in individuals:
+        for relative in individuals:
+            if individual is relative:
+                continue
+            kinship = kinship_index.get_kinship(individual, relative)
+            relationship = pedigree.get_relationship(individual, relative, include_spouses=False)
+            if kinship is None:
+                assert relationship is None or relationship.get_common_ancestor() is None
+            else:
+                assert relationship.get_length() == kinship[1] + kinship[2]
+
+
+def test_caches_are_dropped_after_relationship_values_change(pedigree):
+    elements = pedigree.get_element_dictionary()
+    graph = pedigree.get_relationship_graph()
+    kinship_index = pedigree.get_kinship_index()
+    assert [record.get_pointer() for record, _ in pedigree.get_referrers("@I8@")] == ["@F3@"]
+
+    husband = elements["@F3@"].get_child_elements_by_tag("HUSB")[0]
+    husband.set_value("@I6@")
+
+    assert pedigree.get_relationship_graph() is not graph
+    assert pedigree.get_kinship_index() is not kinship_index
+    assert pointers(pedigree.get_parents(elements["@I9@"])) == ["@I6@", "@I4@"]
+    assert pointers(pedigree.get_relationship_graph().get_spouses(elements["@I4@"])) == ["@I6@"]
+    assert pedigree.get_referrers("@I8@") == []
+    assert [record.get_pointer() for record, _ in pedigree.get_referrers("@I6@")] == ["@F2@", "@F3@"]
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from gedcom.parser import BACKEND_ARRAYS, Parser
+from gedcom.store import ReadOnlyElementError
+
+
+@pytest.fixture
+def parser(sample_file):
+    parser = Parser()
+    parser.parse_file(sample_file, backend=BACKEND_ARRAYS)
+    return parser
+
+
+def test_views_answer_like_elements(parser, sample_file):
+    elements = Parser()
+    elements.parse_file(sample_file)
+
+    for pointer in ("@I1@", "@I3@", "@I4@"):
+        view = parser.get_element_dictionary()[pointer]
+        element = elements.get_element_dictionary()[pointer]
+        assert view.get_name() == element.get_name()
+        assert view.get_birth_data() == element.get_birth_data()
+    family = parser.get_element_dictionary()["@F1@"]
+    assert [member.get_pointer() for member in parser.get_family_members(family)] == \
+        ["@I1@", "@I2@", "@I3@", "@I4@"]
+
+
+def test_record_views_are_reused(parser):
+    store = parser.get_element_store()
+    individual = parser.get_element_dictionary()["@I1@"]
+    assert store.get_element(individual.get_index()) is individual
+    assert parser.get_root_element() is store.get_root_element()
+
+    name = individual.get_child_elements()[0]
+    assert name == individual.get_child_elements()[0]
+    assert name.get_parent_element() is individual
+
+
+def test_views_are_read_only(parser):
+    individual = parser.get_element_dictionary()["@I1@"]
+    with pytest.raises(ReadOnlyElementError):
+        individual.get_child_elements()[0].set_value("Jack /Smith/")
+    with pytest.raises(ReadOnlyElementError):
+        individual.new_child_element("NOTE", value="text")
+
+
+def test_arrays_backend_refuses_workers(sample_file):
+    with pytest.raises(ValueError):
+        Parser().parse_file(sample_file, backend=BACKEND_ARRAYS, workers=2)